@@ -0,0 +1,99 @@
+"""Measure what `check_auth` costs for visitors without a session.
+
+Run from the repository root:
+
+    python -m benchmarks.anonymous_load --loads 2000
+
+Runs `check_auth` for fresh tabs without auth cookies and reports the time
+per load, the auth clients built, the HTTP requests made, the state delta
+sent and the redirects issued. Also follows the redirects `check_auth`
+issues from a clean `/` (up to `MAX_REDIRECTS`); any such redirect reloads
+the page and runs `check_auth` again, so the script exits non-zero if one
+is issued.
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from benchmarks.harness import (
+    NO_SERVER_URL,
+    configure,
+    new_tab,
+    prepare_handlers,
+    substate,
+)
+
+MAX_REDIRECTS = 5
+
+
+async def run(args) -> int:
+    from reflex.utils import format
+
+    from supabase_auth_X_reflex.auth_state import AuthState
+    from supabase_auth_X_reflex.metrics import auth_metrics
+    from supabase_auth_X_reflex.supabase_client import pool_stats
+
+    prepare_handlers()
+
+    def is_redirect(event) -> bool:
+        handler = getattr(event, "handler", None)
+        return handler is not None and handler.fn.__qualname__ == "_redirect"
+
+    async def page_load(query: dict | None = None) -> tuple[float, int, int]:
+        """Return (seconds, redirects, delta bytes) of one check_auth run."""
+        root = new_tab(query=query)
+        auth = substate(root, AuthState)
+        redirects = 0
+        start = time.perf_counter()
+        async for event in auth.check_auth():
+            redirects += is_redirect(event)
+        delta = len(format.json_dumps(root.get_delta()))
+        seconds = time.perf_counter() - start
+        root._clean()
+        return seconds, redirects, delta
+
+    times, redirects, deltas = [], 0, []
+    requests_before = pool_stats()["requests"]
+    for _ in range(args.loads):
+        seconds, load_redirects, delta = await page_load()
+        times.append(seconds)
+        redirects += load_redirects
+        deltas.append(delta)
+    client = auth_metrics.histograms.get(("check_auth", "client"))
+
+    times.sort()
+    print(f"{args.loads} anonymous page loads")
+    print(
+        f"  check_auth      p50 {times[len(times) // 2] * 1e6:>8.1f} us  "
+        f"p99 {times[int(len(times) * 0.99)] * 1e6:>8.1f} us  "
+        f"mean {statistics.fmean(times) * 1e6:>8.1f} us"
+    )
+    print(f"  clients built   {(client.count if client else 0) / args.loads:.2f} per load")
+    print(f"  HTTP requests   {(pool_stats()['requests'] - requests_before) / args.loads:.2f} per load")
+    print(f"  state delta     {statistics.fmean(deltas):.0f} bytes per load")
+    print(f"  redirects       {redirects / args.loads:.2f} per load")
+
+    # A redirect from "/" to "/" loads the page again; follow a few.
+    chain = 0
+    while chain < MAX_REDIRECTS and (await page_load())[1]:
+        chain += 1
+    print(f"  redirect chain  {chain}{'+' if chain == MAX_REDIRECTS else ''} from a clean '/'")
+    cleaned = (await page_load({"error_description": "Access+denied"}))[1]
+    print(f"  redirects to clean '/?error_description=...': {cleaned}")
+    return 1 if chain else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--loads", type=int, default=2000)
+    args = parser.parse_args()
+    # An anonymous load must not need the auth server.
+    configure(NO_SERVER_URL)
+    return asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,215 @@
+"""Drive concurrent simulated sessions through the auth handlers.
+
+Run from the repository root:
+
+    python -m benchmarks.auth_load --sessions 200 --concurrency 50 --latency-ms 20
+
+Starts `gotrue_stub` in-process and points the app at it. Each simulated
+session signs in (by password, or through the OAuth route and callback
+with `--flow oauth`; `--double-submit` sends the password form twice), then
+opens the index page `--page-loads` times, each time in a fresh tab that
+only shares the auth cookies, so `check_auth` runs as it would on load, and
+finally navigates `--navigations` times between protected
+pages in one tab, which runs their `require_auth` guard. `--storage server`
+keeps the sessions in the server-side store instead of cookies, in memory or,
+with `--session-store redis`, in a `resp_stub` started alongside. Reports
+throughput, latency percentiles and GoTrue calls per login. With `--flow oauth`, exits
+non-zero if a login takes more than the one call for the code exchange.
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import sys
+import time
+
+import httpx
+
+from benchmarks.gotrue_stub import GoTrueStub
+from benchmarks.harness import (
+    bind_local,
+    configure,
+    cookies_of,
+    drain,
+    new_tab,
+    prepare_handlers,
+    substate,
+)
+from benchmarks.resp_stub import RespStub
+
+
+def _percentile(samples: list[float], q: float) -> float:
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+def _report(name: str, samples: list[float], wall: float) -> None:
+    print(
+        f"{name:>11}: {len(samples):>6} ops  {len(samples) / wall:>8.1f} ops/s  "
+        f"p50 {_percentile(samples, 0.5) * 1000:>7.1f} ms  "
+        f"p95 {_percentile(samples, 0.95) * 1000:>7.1f} ms  "
+        f"p99 {_percentile(samples, 0.99) * 1000:>7.1f} ms  "
+        f"mean {statistics.fmean(samples) * 1000:>7.1f} ms"
+    )
+
+
+async def run(
+    args, sock: socket.socket, base_url: str, store_sock: socket.socket | None
+) -> int:
+    from fastapi import FastAPI
+
+    from supabase_auth_X_reflex.auth_state import AuthFormState, AuthState
+    from supabase_auth_X_reflex.oauth_route import OAUTH_PATH, oauth_start
+    from supabase_auth_X_reflex.session_store import get_session_store
+    from supabase_auth_X_reflex.supabase_client import close_http_client
+
+    api = FastAPI()
+    api.add_api_route(f"{OAUTH_PATH}/{{provider}}", oauth_start)
+    prepare_handlers()
+
+    stub = GoTrueStub(base_url, args.latency_ms)
+    server = await stub.start(sock=sock)
+    store_stub = RespStub()
+    if store_sock is not None:
+        store_server = await store_stub.start(sock=store_sock)
+
+    def client_ip(i: int) -> str:
+        return f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}"
+
+    async def login(i: int):
+        root = new_tab(ip=client_ip(i))
+        form = substate(root, AuthFormState)
+        if args.flow == "oauth":
+            # The Google button links to the OAuth route, which answers with
+            # the redirect and sets the auth cookies holding the verifier.
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=api, client=(client_ip(i), 123)),
+                base_url="http://app.test",
+            ) as browser:
+                response = await browser.get(f"{OAUTH_PATH}/google")
+                assert response.status_code == 302, response.text
+                cookies = dict(browser.cookies)
+            root = new_tab(cookies, client_ip(i), {"code": f"user{i}"})
+            await drain(root, substate(root, AuthState).check_auth())
+        else:
+            # Reflex runs a tab's events one after another, so a double
+            # click arrives as a second submit right after the first.
+            for _ in range(2 if args.double_submit else 1):
+                await drain(
+                    root,
+                    form.handle_submit(
+                        {"email": f"user{i}@load.test", "password": "password"}
+                    ),
+                )
+        assert substate(root, AuthState).user_id, "login failed"
+        return root
+
+    async def page_load(cookies: dict, ip: str) -> None:
+        root = new_tab(cookies, ip)
+        auth = substate(root, AuthState)
+        await drain(root, auth.check_auth())
+        assert auth.user_id, "check_auth lost the session"
+
+    async def navigate(root) -> None:
+        auth = substate(root, AuthState)
+        await drain(root, auth.require_auth())
+        assert auth.user_id, "require_auth rejected the session"
+
+    login_times: list[float] = []
+    load_times: list[float] = []
+    navigation_times: list[float] = []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def session(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            root = await login(i)
+            login_times.append(time.perf_counter() - start)
+            cookies = cookies_of(root)
+            for _ in range(args.page_loads):
+                start = time.perf_counter()
+                await page_load(cookies, client_ip(i))
+                load_times.append(time.perf_counter() - start)
+            for _ in range(args.navigations):
+                start = time.perf_counter()
+                await navigate(root)
+                navigation_times.append(time.perf_counter() - start)
+
+    if args.flow == "oauth":
+        # Starting the sign in needs no call, and the callback is hydrated
+        # from the code exchange's response instead of asking for the user
+        # again. Counted on a login of its own, before the load starts.
+        await login(args.sessions)
+        probe_calls = sum(stub.calls.values())
+        stub.calls.clear()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session(i) for i in range(args.sessions)))
+    wall = time.perf_counter() - start
+
+    calls = dict(stub.calls)
+    await close_http_client()
+    server.close()
+    await server.wait_closed()
+    if args.storage == "server":
+        await get_session_store().close()
+    if store_sock is not None:
+        store_server.close()
+        await store_server.wait_closed()
+    storage = args.storage
+    if args.storage == "server":
+        storage += f" ({args.session_store})"
+    print(
+        f"{args.sessions} sessions, concurrency {args.concurrency}, "
+        f"flow {args.flow}, storage {storage}, "
+        f"GoTrue latency {args.latency_ms:g} ms, wall {wall:.2f} s"
+    )
+    _report("login", login_times, wall)
+    if load_times:
+        _report("check_auth", load_times, wall)
+    if navigation_times:
+        _report("navigation", navigation_times, wall)
+    print(f"GoTrue calls per login: {sum(calls.values()) / args.sessions:.2f}")
+    for route, count in sorted(calls.items()):
+        print(f"  {route:<40} {count / args.sessions:.2f}")
+    if store_stub.calls:
+        commands = sum(store_stub.calls.values()) - store_stub.calls["CLIENT"]
+        print(f"Session store commands per session: {commands / args.sessions:.2f}")
+    if args.flow == "oauth":
+        print(f"GoTrue calls of one OAuth login on its own: {probe_calls}")
+        if probe_calls > 1:
+            print("FAIL: expected only the code exchange")
+            return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--page-loads", type=int, default=3)
+    parser.add_argument("--navigations", type=int, default=3)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--flow", choices=("password", "oauth"), default="password")
+    parser.add_argument(
+        "--double-submit", action="store_true", help="submit each login form twice"
+    )
+    parser.add_argument("--storage", choices=("cookie", "server"), default="cookie")
+    parser.add_argument(
+        "--session-store", choices=("memory", "redis"), default="memory"
+    )
+    args = parser.parse_args()
+
+    sock, address = bind_local()
+    store_sock, store_url = None, "memory://"
+    if args.storage == "server" and args.session_store == "redis":
+        store_sock, store_address = bind_local()
+        store_url = f"redis://{store_address}"
+    base_url = f"http://{address}"
+    configure(base_url, AUTH_STORAGE=args.storage, AUTH_SESSION_STORE_URL=store_url)
+    return asyncio.run(run(args, sock, base_url, store_sock))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,116 @@
+"""Check that concurrent logins overlap their round trips to the auth server.
+
+Run from the repository root:
+
+    python -m benchmarks.concurrent_logins --logins 20 --latency-ms 200
+
+Starts `gotrue_stub` in-process, signs in once to warm up, then submits
+`--logins` password logins at once, each from its own tab, through
+`AuthFormState.handle_submit`. Each login is one GoTrue round trip, so the
+batch should take one round trip longer than the same batch against a stub
+without latency, not one round trip per login. The shared connection pool
+holds at most `SUPABASE_POOL_MAX_CONNECTIONS` requests at a time, so larger
+batches go out in waves of that size and take one round trip per wave.
+Exits non-zero if the batch takes more than `--max-rtts` extra round trips
+per wave.
+"""
+
+import argparse
+import asyncio
+import math
+import socket
+import sys
+import time
+
+from benchmarks.gotrue_stub import GoTrueStub
+from benchmarks.harness import (
+    bind_local,
+    configure,
+    drain,
+    new_tab,
+    prepare_handlers,
+    substate,
+)
+
+
+async def run(args, sock: socket.socket, base_url: str) -> int:
+    from supabase_auth_X_reflex.auth_state import AuthFormState, AuthState
+    from supabase_auth_X_reflex.supabase_client import (
+        POOL_MAX_CONNECTIONS,
+        close_http_client,
+    )
+
+    prepare_handlers()
+    stub = GoTrueStub(base_url, args.latency_ms)
+    server = await stub.start(sock=sock)
+
+    def tab(i: int):
+        return new_tab(ip=f"10.0.{i >> 8 & 255}.{i & 255}")
+
+    async def login(root, email: str) -> float:
+        form = substate(root, AuthFormState)
+        start = time.perf_counter()
+        await drain(root, form.handle_submit({"email": email, "password": "password"}))
+        elapsed = time.perf_counter() - start
+        assert substate(root, AuthState).user_id, "login failed"
+        return elapsed
+
+    async def batch(name: str) -> tuple[float, list[float]]:
+        # Tabs are set up beforehand, as they would be by earlier page loads.
+        tabs = [tab(i) for i in range(args.logins)]
+        start = time.perf_counter()
+        times = await asyncio.gather(
+            *(login(root, f"user{i}@{name}.test") for i, root in enumerate(tabs))
+        )
+        return time.perf_counter() - start, sorted(times)
+
+    # The first login imports gotrue and opens the first connection.
+    await login(tab(args.logins), "warmup@concurrent.test")
+    # The same batch without latency: the handlers' own work on the event
+    # loop, which no amount of concurrency hides.
+    stub.latency = 0
+    local, _ = await batch("local")
+    stub.latency = args.latency_ms / 1000
+    wall, times = await batch("remote")
+
+    await close_http_client()
+    server.close()
+    await server.wait_closed()
+
+    rtt = args.latency_ms / 1000
+    waves = math.ceil(args.logins / POOL_MAX_CONNECTIONS)
+    budget = local + waves * rtt * args.max_rtts
+    print(
+        f"{args.logins} concurrent logins, GoTrue round trip {args.latency_ms:g} ms, "
+        f"pool of {POOL_MAX_CONNECTIONS} connections ({waves} wave(s))"
+    )
+    print(f"  without latency: {local * 1000:.0f} ms")
+    print(
+        f"  with latency:    {wall * 1000:.0f} ms = {local * 1000:.0f} ms + "
+        f"{(wall - local) / rtt:.2f} round trips "
+        f"(p50 {times[len(times) // 2] * 1000:.0f} ms, max {times[-1] * 1000:.0f} ms)"
+    )
+    if wall > budget:
+        print(f"  FAIL: over the budget of {budget * 1000:.0f} ms")
+        return 1
+    print(f"  ok: within the budget of {budget * 1000:.0f} ms")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--logins", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=200.0)
+    parser.add_argument(
+        "--max-rtts", type=float, default=1.25, help="allowed round trips per wave"
+    )
+    args = parser.parse_args()
+
+    sock, address = bind_local()
+    base_url = f"http://{address}"
+    configure(base_url)
+    return asyncio.run(run(args, sock, base_url))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+"""Compare the auth cookie formats: bytes on the wire and encode/decode time.
+
+Run from the repository root:
+
+    python -m benchmarks.cookie_format
+
+The legacy format is the `{"toplevel": {...}}` dict the storage used to keep
+in a single cookie, sent as percent-encoded JSON.
+"""
+
+import base64
+import json
+import os
+import secrets
+import time
+import timeit
+from urllib.parse import quote
+
+from supabase_auth_X_reflex import cookie_codec
+
+STORAGE_KEY = "supabase.auth.token"
+
+
+def _fake_jwt(claims: dict) -> str:
+    def part(data: dict) -> str:
+        raw = json.dumps(data, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).rstrip(b"=").decode()
+
+    signature = base64.urlsafe_b64encode(os.urandom(32)).rstrip(b"=").decode()
+    return f"{part({'alg': 'HS256', 'typ': 'JWT'})}.{part(claims)}.{signature}"
+
+
+def make_items(metadata_size: int) -> dict[str, str]:
+    """Build storage items like the ones GoTrue writes after a sign in."""
+    now = int(time.time())
+    user_metadata = {
+        "full_name": "Jane Doe",
+        "avatar_url": "https://lh3.googleusercontent.com/a/" + secrets.token_hex(24),
+        "bio": "x" * metadata_size,
+    }
+    user = {
+        "id": "8d3c5a1e-6f0b-4a8e-9c3d-2b7f1e4a5c6d",
+        "aud": "authenticated",
+        "role": "authenticated",
+        "email": "jane@example.com",
+        "app_metadata": {"provider": "google", "providers": ["google"]},
+        "user_metadata": user_metadata,
+        "created_at": "2024-01-01T00:00:00Z",
+    }
+    access_token = _fake_jwt(
+        {
+            "sub": user["id"],
+            "email": user["email"],
+            "exp": now + 3600,
+            "iat": now,
+            "user_metadata": user_metadata,
+            "role": "authenticated",
+            "aud": "authenticated",
+        }
+    )
+    session = {
+        "access_token": access_token,
+        "refresh_token": secrets.token_urlsafe(16),
+        "expires_in": 3600,
+        "expires_at": now + 3600,
+        "token_type": "bearer",
+        "user": user,
+    }
+    return {
+        STORAGE_KEY: json.dumps(session),
+        f"{STORAGE_KEY}-code-verifier": secrets.token_urlsafe(42),
+    }
+
+
+def legacy_encode(items: dict[str, str]) -> str:
+    return json.dumps({"toplevel": items})
+
+
+def legacy_decode(value: str) -> dict[str, str]:
+    return json.loads(value)["toplevel"]
+
+
+def _time_us(fn, number: int = 2000) -> float:
+    return min(timeit.repeat(fn, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> None:
+    header = (
+        f"{'metadata':>9} {'legacy B':>9} {'json B':>8} {'zlib B':>8} "
+        f"{'cookies':>7} {'legacy enc/dec us':>18} {'zlib enc/dec us':>16}"
+    )
+    print(header)
+    print("-" * len(header))
+    for metadata_size in (0, 500, 2000, 5000):
+        items = make_items(metadata_size)
+
+        legacy = legacy_encode(items)
+        plain = cookie_codec.encode(items, compress=False)
+        packed = cookie_codec.encode(items, compress=True)
+        assert legacy_decode(legacy) == items
+        assert cookie_codec.decode(plain) == items
+        assert cookie_codec.decode(packed) == items
+
+        # Bytes as they appear in the Cookie header of every request.
+        legacy_bytes = len("auth_storage=") + len(quote(legacy, safe=""))
+        chunks = cookie_codec.split(packed)
+        plain_bytes = sum(
+            len(f"auth_storage_{i}=") + len(chunk)
+            for i, chunk in enumerate(cookie_codec.split(plain))
+        )
+        packed_bytes = sum(
+            len(f"auth_storage_{i}=") + len(chunk) for i, chunk in enumerate(chunks)
+        )
+
+        legacy_times = (
+            _time_us(lambda: legacy_encode(items)),
+            _time_us(lambda: legacy_decode(legacy)),
+        )
+        packed_times = (
+            _time_us(lambda: cookie_codec.encode(items)),
+            _time_us(lambda: cookie_codec.decode(packed)),
+        )
+        print(
+            f"{metadata_size:>9} {legacy_bytes:>9} {plain_bytes:>8} "
+            f"{packed_bytes:>8} {len(chunks):>7} "
+            f"{legacy_times[0]:>8.1f}/{legacy_times[1]:<9.1f} "
+            f"{packed_times[0]:>7.1f}/{packed_times[1]:<8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
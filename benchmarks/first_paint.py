@@ -0,0 +1,129 @@
+"""Measure the time to authenticated content for returning users.
+
+Run from the repository root:
+
+    python -m benchmarks.first_paint --users 50 --latency-ms 50
+
+Signs users in against `gotrue_stub`, then opens the index page for each of
+them in a new tab with their cookies, running its on_load handlers as Reflex
+does after hydration. Reports the server time until the first state update
+that carries the user (when `mainApp()` can render) and until all handlers
+are done, with `AUTH_INSTANT_PAINT` off and on. The session cache is cleared
+before the visits, as for a user coming back to a fresh worker; use
+`--verify-mode local` to verify tokens without the auth server.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.gotrue_stub import GoTrueStub
+from benchmarks.harness import (
+    bind_local,
+    configure,
+    cookies_of,
+    drain,
+    new_tab,
+    prepare_handlers,
+    send_update,
+    substate,
+)
+
+
+async def measure(args, sock: socket.socket, base_url: str) -> None:
+    from supabase_auth_X_reflex.auth_state import AuthFormState, AuthState
+    from supabase_auth_X_reflex.session_cache import session_cache
+    from supabase_auth_X_reflex.supabase_client import close_http_client
+
+    prepare_handlers()
+    server = await GoTrueStub(base_url, args.latency_ms).start(sock=sock)
+
+    def client_ip(i: int) -> str:
+        return f"10.0.{i >> 8 & 255}.{i & 255}"
+
+    users = []
+    for i in range(args.users):
+        root = new_tab(ip=client_ip(i))
+        form = substate(root, AuthFormState)
+        await drain(
+            root, form.handle_submit({"email": f"user{i}@paint.test", "password": "pw"})
+        )
+        users.append(cookies_of(root))
+    session_cache._entries.clear()
+
+    first_content, completed = [], []
+    for i, cookies in enumerate(users):
+        root = new_tab(cookies, client_ip(i))
+        auth = substate(root, AuthState)
+        start = time.perf_counter()
+        shown = None
+
+        def update() -> None:
+            nonlocal shown
+            delta = send_update(root)
+            if shown is None and delta.get(AuthState.get_full_name(), {}).get("user_id"):
+                shown = time.perf_counter() - start
+
+        # The index page's on_load handlers, each its own event.
+        auth.restore_session()
+        update()
+        async for _ in auth.check_auth():
+            update()
+        update()
+        completed.append(time.perf_counter() - start)
+        assert auth.user_id and shown is not None, "check_auth lost the session"
+        first_content.append(shown)
+
+    await close_http_client()
+    server.close()
+    await server.wait_closed()
+
+    def ms(samples: list[float], q: float) -> float:
+        return sorted(samples)[int(q * (len(samples) - 1))] * 1000
+
+    print(
+        f"instant paint {os.environ['AUTH_INSTANT_PAINT']:>5}: "
+        f"content p50 {ms(first_content, 0.5):>6.1f} ms  p95 {ms(first_content, 0.95):>6.1f} ms  "
+        f"mean {statistics.fmean(first_content) * 1000:>6.1f} ms | "
+        f"on_load done p50 {ms(completed, 0.5):>6.1f} ms"
+    )
+
+
+def child(args) -> None:
+    sock, address = bind_local()
+    base_url = f"http://{address}"
+    configure(base_url, AUTH_VERIFY_MODE=args.verify_mode, AUTH_THROTTLE="false")
+    asyncio.run(measure(args, sock, base_url))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=50.0)
+    parser.add_argument("--verify-mode", choices=("remote", "local"), default="remote")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    print(
+        f"{args.users} returning users, verify mode {args.verify_mode}, "
+        f"GoTrue latency {args.latency_ms:g} ms"
+    )
+    # The mode is read at import time, so each one runs in its own process.
+    for mode in ("false", "true"):
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.first_paint", "--child", *sys.argv[1:]],
+            env={**os.environ, "AUTH_INSTANT_PAINT": mode},
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
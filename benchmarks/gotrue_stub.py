@@ -0,0 +1,224 @@
+"""A local stand-in for the GoTrue endpoints this app uses.
+
+Run it on its own:
+
+    python -m benchmarks.gotrue_stub --port 9999 --latency-ms 20
+
+and point the app at it with SUPABASE_URL=http://127.0.0.1:9999 and
+SUPABASE_JWT_SECRET=stub-jwt-secret. It implements password sign in, sign up,
+get_user, token refresh, PKCE code exchange, password recovery and logout.
+Every user and password is accepted; OAuth codes are accepted as-is, with
+any PKCE verifier, and sign in `<code>@oauth.test`. Each request waits
+`latency_ms` before answering.
+
+`GET /__stats` returns the number of calls per endpoint and
+`POST /__stats/reset` clears them, along with the count of rejected
+refreshes. Only the standard library is used.
+"""
+
+import argparse
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import time
+import uuid
+from collections import Counter
+from urllib.parse import parse_qs, urlsplit
+
+JWT_SECRET = "stub-jwt-secret"
+TOKEN_LIFETIME = 3600
+
+
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _b64json(data: dict) -> str:
+    return _b64(json.dumps(data, separators=(",", ":")).encode())
+
+
+def sign_jwt(claims: dict, secret: str = JWT_SECRET) -> str:
+    signing_input = f"{_b64json({'alg': 'HS256', 'typ': 'JWT'})}.{_b64json(claims)}"
+    signature = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256)
+    return f"{signing_input}.{_b64(signature.digest())}"
+
+
+def decode_jwt(token: str, secret: str = JWT_SECRET) -> dict | None:
+    try:
+        signing_input, signature = token.rsplit(".", 1)
+        expected = hmac.new(secret.encode(), signing_input.encode(), hashlib.sha256)
+        if not hmac.compare_digest(_b64(expected.digest()), signature):
+            return None
+        payload = signing_input.split(".", 1)[1]
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except ValueError:
+        return None
+    return claims if claims.get("exp", 0) > time.time() else None
+
+
+class GoTrueStub:
+    """In-memory GoTrue: users by email, refresh tokens by value."""
+
+    def __init__(self, base_url: str, latency_ms: float = 0.0, secret: str = JWT_SECRET):
+        self.issuer = f"{base_url}/auth/v1"
+        self.latency = latency_ms / 1000
+        self.secret = secret
+        self.users: dict[str, dict] = {}
+        self.refresh_tokens: dict[str, str] = {}
+        self.calls: Counter[str] = Counter()
+        # Requests answered with an error, e.g. a reused refresh token.
+        self.rejected = 0
+
+    def _user(self, email: str, metadata: dict | None = None) -> dict:
+        user = self.users.get(email)
+        if user is None:
+            user = self.users[email] = {
+                "id": str(uuid.uuid4()),
+                "aud": "authenticated",
+                "role": "authenticated",
+                "email": email,
+                "app_metadata": {"provider": "email", "providers": ["email"]},
+                "user_metadata": metadata or {"full_name": email.split("@")[0]},
+                "created_at": "2024-01-01T00:00:00Z",
+            }
+        return user
+
+    def _session(self, user: dict) -> dict:
+        now = int(time.time())
+        access_token = sign_jwt(
+            {
+                "sub": user["id"],
+                "email": user["email"],
+                "aud": "authenticated",
+                "role": "authenticated",
+                "iss": self.issuer,
+                "iat": now,
+                "exp": now + TOKEN_LIFETIME,
+                "user_metadata": user["user_metadata"],
+            },
+            self.secret,
+        )
+        refresh_token = secrets.token_urlsafe(16)
+        self.refresh_tokens[refresh_token] = user["email"]
+        return {
+            "access_token": access_token,
+            "token_type": "bearer",
+            "expires_in": TOKEN_LIFETIME,
+            "expires_at": now + TOKEN_LIFETIME,
+            "refresh_token": refresh_token,
+            "user": user,
+        }
+
+    def _bearer_user(self, headers: dict) -> dict | None:
+        token = headers.get("authorization", "").removeprefix("Bearer ").strip()
+        claims = decode_jwt(token, self.secret)
+        return self.users.get(claims["email"]) if claims else None
+
+    def handle(self, method: str, path: str, query: dict, headers: dict, body: dict):
+        """Return (status, json body or None) for one request."""
+        path = path.removeprefix("/auth/v1")
+        grant_type = query.get("grant_type", [""])[0]
+        route = f"{method} {path}" + (f"?grant_type={grant_type}" if grant_type else "")
+        self.calls[route] += 1
+
+        if route == "POST /token?grant_type=password":
+            return 200, self._session(self._user(body["email"]))
+        if route == "POST /token?grant_type=refresh_token":
+            email = self.refresh_tokens.pop(body.get("refresh_token"), None)
+            if email is None:
+                return 400, {
+                    "error": "invalid_grant",
+                    "error_description": "Invalid Refresh Token: Already Used",
+                }
+            return 200, self._session(self.users[email])
+        if route == "POST /token?grant_type=pkce":
+            if not body.get("code_verifier"):
+                return 400, {
+                    "error": "invalid_request",
+                    "error_description": "code verifier missing",
+                }
+            return 200, self._session(self._user(f"{body['auth_code']}@oauth.test"))
+        if route == "POST /signup":
+            data = (body.get("options") or {}).get("data") or body.get("data")
+            return 200, self._user(body["email"], data)
+        if route == "GET /user":
+            user = self._bearer_user(headers)
+            if user is None:
+                return 401, {"code": 401, "msg": "Invalid JWT"}
+            return 200, user
+        if route == "POST /logout":
+            return 204, None
+        if route == "POST /recover":
+            return 200, {}
+        if route == "GET /.well-known/jwks.json":
+            return 200, {"keys": []}
+        return 404, {"code": 404, "msg": f"Not found: {route}"}
+
+    async def _serve_connection(self, reader, writer) -> None:
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                method, target, _ = request_line.decode().split(" ", 2)
+                headers = {}
+                while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+                    name, value = line.decode().split(":", 1)
+                    headers[name.strip().lower()] = value.strip()
+                raw = await reader.readexactly(int(headers.get("content-length", 0)))
+                url = urlsplit(target)
+
+                if url.path == "/__stats":
+                    status, payload = 200, dict(self.calls)
+                elif url.path == "/__stats/reset" and method == "POST":
+                    self.calls.clear()
+                    self.rejected = 0
+                    status, payload = 200, {}
+                else:
+                    await asyncio.sleep(self.latency)
+                    status, payload = self.handle(
+                        method,
+                        url.path,
+                        parse_qs(url.query),
+                        headers,
+                        json.loads(raw) if raw else {},
+                    )
+                    if status >= 400:
+                        self.rejected += 1
+
+                data = b"" if payload is None else json.dumps(payload).encode()
+                writer.write(
+                    f"HTTP/1.1 {status} STUB\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(data)}\r\n\r\n".encode()
+                    + data
+                )
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, sock=None):
+        if sock is not None:
+            return await asyncio.start_server(self._serve_connection, sock=sock)
+        return await asyncio.start_server(self._serve_connection, host, port)
+
+
+async def _main(args) -> None:
+    stub = GoTrueStub(f"http://{args.host}:{args.port}", args.latency_ms)
+    server = await stub.start(args.host, args.port)
+    print(f"GoTrue stub listening on http://{args.host}:{args.port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=9999)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    asyncio.run(_main(parser.parse_args()))
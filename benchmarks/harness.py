@@ -0,0 +1,111 @@
+"""Shared setup for the benchmarks that run the auth handlers in-process.
+
+The app reads its configuration at import time, so a script binds its stubs'
+ports with `bind_local` and calls `configure` before it imports anything from
+the app; the helpers here import reflex and the app only when called.
+"""
+
+import os
+import socket
+import uuid
+
+from benchmarks.gotrue_stub import JWT_SECRET
+
+# Nothing listens here; for runs that must not need the auth server.
+NO_SERVER_URL = "http://127.0.0.1:9"
+
+
+def bind_local() -> tuple[socket.socket, str]:
+    """Bind a free local port for a stub; returns the socket and `host:port`."""
+    sock = socket.socket()
+    sock.bind(("127.0.0.1", 0))
+    return sock, f"127.0.0.1:{sock.getsockname()[1]}"
+
+
+def configure(supabase_url: str, **env: str) -> None:
+    """Point the app at `supabase_url`, with `env` on top of the defaults.
+
+    Background refreshes and the stall detector are off, so only the
+    handlers a script drives do any work.
+    """
+    os.environ.update(
+        {
+            "SUPABASE_URL": supabase_url,
+            "SUPABASE_KEY": "stub-anon-key",
+            "SUPABASE_JWT_SECRET": JWT_SECRET,
+            "AUTH_BACKGROUND_REFRESH": "false",
+            "STALL_DETECTOR": "false",
+            "LOG_LEVEL": os.environ.get("LOG_LEVEL", "WARNING"),
+            **env,
+        }
+    )
+
+
+def prepare_handlers() -> None:
+    """Set up what the handlers expect from the page they run on."""
+    import reflex as rx
+
+    # Handlers may answer with a toast, which needs the page's provider.
+    rx.toast.provider()
+
+
+def substate(root, state_cls):
+    return root.get_substate(state_cls.get_full_name().split("."))
+
+
+def new_tab(cookies: dict | None = None, ip: str = "127.0.0.1", query: dict | None = None):
+    """A fresh tab's root state, as Reflex builds it for a page load.
+
+    `cookies` are the auth cookies the browser sends, named like their vars.
+    The initial delta is already sent, so the next one only holds changes.
+    """
+    import reflex as rx
+    from reflex.istate.data import RouterData
+
+    from supabase_auth_X_reflex.auth_state import AuthState, AuthStorage
+
+    root = rx.State(_reflex_internal_init=True)
+    path = "/" if not query else "/?" + "&".join(f"{k}={v}" for k, v in query.items())
+    root.router_data = {
+        "pathname": "/",
+        "query": query or {},
+        "asPath": path,
+        "token": str(uuid.uuid4()),
+        "sid": str(uuid.uuid4()),
+        "headers": {},
+        "ip": ip,
+    }
+    root.router = RouterData(root.router_data)
+    storage = substate(root, AuthStorage)
+    auth = substate(root, AuthState)
+    for name, value in (cookies or {}).items():
+        setattr(auth if name == "auth_claims" else storage, name, value)
+    send_update(root)
+    return root
+
+
+def cookies_of(root) -> dict:
+    """The auth cookies a tab left in the browser."""
+    from supabase_auth_X_reflex.auth_state import AuthState, AuthStorage
+
+    storage = substate(root, AuthStorage)
+    cookies = {name: getattr(storage, name) for name in storage.base_vars}
+    return {**cookies, "auth_claims": substate(root, AuthState).auth_claims}
+
+
+def send_update(root) -> dict:
+    """Serialize the pending delta as Reflex does before sending it."""
+    from reflex.utils import format
+
+    delta = root.get_delta()
+    format.json_dumps(delta)
+    root._clean()
+    return delta
+
+
+async def drain(root, events) -> None:
+    """Run a handler, sending an update per yield and one when it ends."""
+    if hasattr(events, "__aiter__"):
+        async for _ in events:
+            send_update(root)
+    send_update(root)
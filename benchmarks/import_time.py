@@ -0,0 +1,82 @@
+"""Measure the cold-start import time of the app, broken down by package.
+
+Run from the repository root:
+
+    python -m benchmarks.import_time
+    python -m benchmarks.import_time --module supabase_auth_X_reflex.auth_state
+
+Imports the module in fresh interpreters with `python -X importtime` and
+reports the median over `--runs`: the total, the self time summed per
+top-level package, and this package's own modules. Also lists which of the
+Supabase client libraries ended up imported.
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+
+PACKAGE = "supabase_auth_X_reflex"
+SUPABASE_STACK = ("supabase", "gotrue", "postgrest", "storage3", "realtime", "supafunc")
+
+
+def _import_once(module: str) -> tuple[float, dict[str, float], set[str]]:
+    """Return (total ms, self ms per module, imported modules) for one run."""
+    code = f"import sys; import {module}; print(' '.join(sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        # Keep the app's import-time configuration quiet and deterministic.
+        env={**os.environ, "LOG_LEVEL": "WARNING", "STALL_DETECTOR": "false"},
+    )
+    self_ms: dict[str, float] = {}
+    total = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        own, cumulative, name = line.removeprefix("import time:").split("|")
+        self_ms[name.strip()] = int(own) / 1000
+        if name.strip() == module:
+            total = int(cumulative) / 1000
+    return total, self_ms, set(result.stdout.split())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--module", default=f"{PACKAGE}.{PACKAGE}")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=12)
+    args = parser.parse_args()
+
+    runs = [_import_once(args.module) for _ in range(args.runs)]
+    by_module: dict[str, list[float]] = defaultdict(list)
+    for _, self_ms, _ in runs:
+        for name, ms in self_ms.items():
+            by_module[name].append(ms)
+
+    def median(name: str) -> float:
+        return statistics.median(by_module[name] + [0.0] * (args.runs - len(by_module[name])))
+
+    by_package: dict[str, float] = defaultdict(float)
+    for name in by_module:
+        by_package[name.split(".")[0]] += median(name)
+
+    print(f"import {args.module}: {statistics.median(r[0] for r in runs):.0f} ms "
+          f"(median of {args.runs} runs)")
+    print("\nself time by top-level package")
+    for package, ms in sorted(by_package.items(), key=lambda i: -i[1])[: args.top]:
+        print(f"  {package:<32} {ms:>8.1f} ms")
+    print(f"\n{PACKAGE} modules")
+    for name in sorted(n for n in by_module if n.split(".")[0] == PACKAGE):
+        print(f"  {name:<48} {median(name):>8.1f} ms")
+    imported = set.union(*(r[2] for r in runs))
+    loaded = [name for name in SUPABASE_STACK if name in imported]
+    print(f"\nSupabase libraries imported: {', '.join(loaded) or 'none'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Measure the per-record cost of the logging setup on the calling thread.
+
+Run from the repository root:
+
+    python -m benchmarks.logging_cost
+
+Compares the formatter that built a `logging.Formatter` per record with the
+current one; a synchronous stream handler with the stock queue handler and
+the `LocalQueueHandler` used by `configure_logger`; and eager f-string
+storage logging with the lazy, level-guarded calls used now.
+"""
+
+import logging
+import logging.handlers
+import os
+import queue
+import timeit
+
+from supabase_auth_X_reflex.logging_info import CustomFormatter, LocalQueueHandler
+
+N = 20000
+ITEMS = {"supabase.auth.token": "x" * 1500, "supabase.auth.token-code-verifier": "y"}
+
+
+class PerRecordFormatter(CustomFormatter):
+    """The previous formatter, building a new Formatter for every record."""
+
+    def format(self, record):
+        return logging.Formatter(self.FORMATS.get(record.levelno)).format(record)
+
+
+def _record() -> logging.LogRecord:
+    return logging.LogRecord(
+        "bench", logging.WARNING, __file__, 1, "Current keys: %s", (list(ITEMS),), None
+    )
+
+
+def _per_record_us(fn) -> float:
+    return min(timeit.repeat(fn, number=N, repeat=3)) / N * 1e6
+
+
+def _logger(handler: logging.Handler, level: int) -> logging.Logger:
+    logger = logging.getLogger(f"bench.{id(handler)}")
+    logger.handlers[:] = [handler]
+    logger.propagate = False
+    logger.setLevel(level)
+    return logger
+
+
+def main() -> None:
+    record = _record()
+    print("formatter")
+    print(f"  per-record Formatter  {_per_record_us(lambda: PerRecordFormatter().format(record)):7.2f} us")
+    formatter = CustomFormatter()
+    print(f"  cached Formatter      {_per_record_us(lambda: formatter.format(record)):7.2f} us")
+
+    with open(os.devnull, "w") as devnull:
+        stream_handler = logging.StreamHandler(devnull)
+        stream_handler.setFormatter(CustomFormatter())
+        sync_logger = _logger(stream_handler, logging.INFO)
+
+        log_queue = queue.SimpleQueue()
+        listener = logging.handlers.QueueListener(log_queue, stream_handler)
+        listener.start()
+        stock_logger = _logger(logging.handlers.QueueHandler(log_queue), logging.INFO)
+        queued_logger = _logger(LocalQueueHandler(log_queue), logging.INFO)
+
+        print("handler (caller thread, one INFO record)")
+        print(f"  sync StreamHandler    {_per_record_us(lambda: sync_logger.info('Signed in %s', 'user')):7.2f} us")
+        print(f"  stock QueueHandler    {_per_record_us(lambda: stock_logger.info('Signed in %s', 'user')):7.2f} us")
+        print(f"  LocalQueueHandler     {_per_record_us(lambda: queued_logger.info('Signed in %s', 'user')):7.2f} us")
+        listener.stop()
+
+        print("storage logging at INFO level")
+        print(
+            f"  eager f-string        "
+            f"{_per_record_us(lambda: sync_logger.info(f'Setting storage item: token = {ITEMS}')):7.2f} us"
+        )
+
+        def lazy():
+            if queued_logger.isEnabledFor(logging.DEBUG):
+                queued_logger.debug("Current keys in auth_storage: %s", list(ITEMS))
+
+        print(f"  lazy, level-guarded   {_per_record_us(lazy):7.2f} us")
+
+
+if __name__ == "__main__":
+    main()
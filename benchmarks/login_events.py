@@ -0,0 +1,81 @@
+"""Count the websocket events one login sends to the server.
+
+Run from the repository root:
+
+    python -m benchmarks.login_events
+
+Walks the auth forms and counts the event triggers that fire while a user
+types their credentials and submits. Controlled inputs (`on_change`) send one
+event per keystroke; uncontrolled inputs only reach the server with the
+form's `on_submit`.
+"""
+
+import reflex as rx
+
+from supabase_auth_X_reflex.auth_component import (
+    forgot_password_component,
+    login_component,
+    signup_component,
+)
+
+# Per-keystroke triggers of an input.
+KEYSTROKE_TRIGGERS = ("on_change", "on_key_down", "on_key_up", "on_input")
+
+SAMPLE = {
+    "full_name": "Jane",
+    "email": "jane.doe@example.com",
+    "password": "correct horse battery",
+}
+
+
+def _walk(component: rx.Component):
+    yield component
+    children = list(getattr(component, "children", []))
+    # rx.cond keeps its branches outside of `children`.
+    for branch in ("comp1", "comp2"):
+        child = getattr(component, branch, None)
+        if isinstance(child, rx.Component):
+            children.append(child)
+    for child in children:
+        yield from _walk(child)
+
+
+def _has_trigger(component: rx.Component, trigger: str) -> bool:
+    return trigger in (getattr(component, "event_triggers", None) or {})
+
+
+def count_events(component: rx.Component, fields: dict[str, str]) -> int:
+    """Events sent while filling the form with `fields` and pressing Continue."""
+    # Controlled inputs: one event per typed character, matched in render order.
+    keystroke_inputs = [
+        c
+        for c in _walk(component)
+        if any(_has_trigger(c, t) for t in KEYSTROKE_TRIGGERS)
+    ]
+    keystrokes = sum(len(value) for value, _ in zip(fields.values(), keystroke_inputs))
+    # The form's on_submit and the on_click of its Continue button.
+    submit = 0
+    for form in _walk(component):
+        if _has_trigger(form, "on_submit"):
+            submit += 1 + sum(
+                _has_trigger(c, "on_click")
+                for c in _walk(form)
+                if getattr(c, "tag", None) == "Button"
+            )
+    return keystrokes + submit
+
+
+def main() -> None:
+    forms = {
+        "login": (login_component(), ["email", "password"]),
+        "signup": (signup_component(), ["full_name", "email", "password"]),
+        "forgot_password": (forgot_password_component(), ["email"]),
+    }
+    for name, (form, field_names) in forms.items():
+        fields = {field: SAMPLE[field] for field in field_names}
+        typed = sum(len(value) for value in fields.values())
+        print(f"{name:>16}: {count_events(form, fields):>3} events ({typed} chars typed)")
+
+
+if __name__ == "__main__":
+    main()
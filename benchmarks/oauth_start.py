@@ -0,0 +1,105 @@
+"""Compare the two ways of starting an OAuth sign in.
+
+Run from the repository root:
+
+    python -m benchmarks.oauth_start --starts 2000
+
+The websocket path is what the Google button used to trigger: the
+`start_loading` and `sign_in_with_oauth` events, each answered with a state
+update, the last one carrying the redirect. The HTTP path is a plain link to
+the OAuth route, answered with a 302. Reports the server time per start, the
+messages the browser has to wait for before it can leave, and the bytes
+they carry. Neither path calls the auth server.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+from benchmarks.harness import (
+    NO_SERVER_URL,
+    configure,
+    new_tab,
+    prepare_handlers,
+    substate,
+)
+
+
+def _summary(name: str, times: list[float], messages: int, size: int) -> None:
+    times = sorted(times)
+    print(
+        f"{name:>9}: p50 {times[len(times) // 2] * 1e6:>7.0f} us  "
+        f"mean {statistics.fmean(times) * 1e6:>7.0f} us  "
+        f"{messages} round trip(s) before leaving, {size} bytes"
+    )
+
+
+async def run(args) -> None:
+    import httpx
+    from fastapi import FastAPI
+    from reflex.utils import format
+
+    from supabase_auth_X_reflex.auth_state import AuthFormState
+    from supabase_auth_X_reflex.oauth_route import OAUTH_PATH, oauth_start
+
+    prepare_handlers()
+
+    async def websocket_start() -> tuple[float, int]:
+        root = new_tab()
+        form = substate(root, AuthFormState)
+        start = time.perf_counter()
+        size = 0
+        # Reflex sends one update per yield and one when the handler ends.
+        for events in (form.start_loading(), form.sign_in_with_oauth("google")):
+            if hasattr(events, "__aiter__"):
+                updates = [e async for e in events]
+            else:
+                updates = list(events)
+            size += len(format.json_dumps(root.get_delta()))
+            size += len(format.json_dumps([str(e) for e in updates if e is not None]))
+            root._clean()
+        return time.perf_counter() - start, size
+
+    api = FastAPI()
+    api.add_api_route(f"{OAUTH_PATH}/{{provider}}", oauth_start)
+
+    async def http_start(browser: httpx.AsyncClient) -> tuple[float, int]:
+        browser.cookies.clear()
+        start = time.perf_counter()
+        response = await browser.get(f"{OAUTH_PATH}/google")
+        elapsed = time.perf_counter() - start
+        assert response.status_code == 302, response.text
+        size = sum(len(k) + len(v) + 4 for k, v in response.headers.raw)
+        return elapsed, size
+
+    ws_times, ws_size = [], 0
+    for _ in range(args.starts):
+        elapsed, ws_size = await websocket_start()
+        ws_times.append(elapsed)
+
+    http_times, http_size = [], 0
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=api), base_url="http://app.test"
+    ) as browser:
+        for _ in range(args.starts):
+            elapsed, http_size = await http_start(browser)
+            http_times.append(elapsed)
+
+    print(f"{args.starts} OAuth sign in starts")
+    _summary("websocket", ws_times, 2, ws_size)
+    _summary("http", http_times, 1, http_size)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--starts", type=int, default=2000)
+    args = parser.parse_args()
+    # Starting a sign in must not need the auth server. Every start comes
+    # from one address; compare the handlers only.
+    configure(NO_SERVER_URL, AUTH_THROTTLE="false")
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""A local stand-in for the Redis commands the session store uses.
+
+Run it on its own:
+
+    python -m benchmarks.resp_stub --port 6399
+
+and point the app at it with AUTH_STORAGE=server and
+AUTH_SESSION_STORE_URL=redis://127.0.0.1:6399. It speaks RESP2 and implements
+GET, SET (with EX or PX), DEL, TTL, PING and FLUSHDB, and answers the
+connection setup commands of redis-py (CLIENT, SELECT) with OK. Keys expire
+when read after their TTL. `.calls` counts the commands received. Only the
+standard library is used.
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+
+
+class RespStub:
+    def __init__(self):
+        self.calls: Counter[str] = Counter()
+        self._entries: dict[bytes, tuple[float | None, bytes]] = {}
+
+    def _get(self, key: bytes) -> bytes | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        return value
+
+    def handle(self, command: str, args: list[bytes]):
+        """Answer one command; returns the reply as a Python value."""
+        if command in ("CLIENT", "SELECT"):
+            return "OK"
+        if command == "PING":
+            return args[0] if args else "PONG"
+        if command == "FLUSHDB":
+            self._entries.clear()
+            return "OK"
+        if command == "GET":
+            return self._get(args[0])
+        if command == "SET":
+            key, value, options = args[0], args[1], [a.upper() for a in args[2:]]
+            expires_at = None
+            if b"EX" in options:
+                expires_at = time.monotonic() + int(args[2 + options.index(b"EX") + 1])
+            elif b"PX" in options:
+                ms = int(args[2 + options.index(b"PX") + 1])
+                expires_at = time.monotonic() + ms / 1000
+            self._entries[key] = (expires_at, value)
+            return "OK"
+        if command == "DEL":
+            return sum(self._entries.pop(key, None) is not None for key in args)
+        if command == "TTL":
+            if self._get(args[0]) is None:
+                return -2
+            expires_at = self._entries[args[0]][0]
+            if expires_at is None:
+                return -1
+            return round(expires_at - time.monotonic())
+        return ValueError(f"ERR unknown command '{command}'")
+
+    @staticmethod
+    def _encode(reply) -> bytes:
+        if reply is None:
+            return b"$-1\r\n"
+        if isinstance(reply, ValueError):
+            return f"-{reply}\r\n".encode()
+        if isinstance(reply, str):
+            return f"+{reply}\r\n".encode()
+        if isinstance(reply, int):
+            return f":{reply}\r\n".encode()
+        return b"$%d\r\n%s\r\n" % (len(reply), reply)
+
+    async def _serve_connection(self, reader, writer) -> None:
+        try:
+            while True:
+                header = await reader.readline()
+                if not header:
+                    break
+                if not header.startswith(b"*"):
+                    writer.write(b"-ERR only RESP arrays are supported\r\n")
+                    break
+                args = []
+                for _ in range(int(header[1:])):
+                    length = int((await reader.readline())[1:])
+                    args.append((await reader.readexactly(length + 2))[:-2])
+                command = args[0].decode().upper()
+                self.calls[command] += 1
+                writer.write(self._encode(self.handle(command, args[1:])))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0, sock=None):
+        if sock is not None:
+            return await asyncio.start_server(self._serve_connection, sock=sock)
+        return await asyncio.start_server(self._serve_connection, host, port)
+
+
+async def _main(args) -> None:
+    server = await RespStub().start(args.host, args.port)
+    print(f"RESP stub listening on redis://{args.host}:{args.port}")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6399)
+    asyncio.run(_main(parser.parse_args()))
@@ -0,0 +1,113 @@
+"""Check the server-side session stores against their contract.
+
+Run from the repository root:
+
+    python -m benchmarks.session_store
+
+Runs get, set, overwrite, delete and TTL expiry against `MemorySessionStore`
+and, through `resp_stub`, `RedisSessionStore`, then stores, reads and removes
+items through `ServerSessionStorage` the way gotrue does with
+AUTH_STORAGE=server. Exits non-zero if any check fails.
+"""
+
+import asyncio
+import socket
+import sys
+
+from benchmarks.harness import NO_SERVER_URL, bind_local, configure, new_tab, substate
+from benchmarks.resp_stub import RespStub
+
+failures: list[str] = []
+
+
+def check(name: str, ok: bool) -> None:
+    print(f"  {'ok  ' if ok else 'FAIL'} {name}")
+    if not ok:
+        failures.append(name)
+
+
+async def check_store(store) -> None:
+    print(type(store).__name__)
+    check("missing key reads as None", await store.get("auth:a:missing") is None)
+    await store.set("auth:a:session", "one", 60)
+    check("set then get", await store.get("auth:a:session") == "one")
+    await store.set("auth:a:session", "two", 60)
+    check("overwrite", await store.get("auth:a:session") == "two")
+    check("keys are separate", await store.get("auth:b:session") is None)
+    await store.delete("auth:a:session")
+    check("delete", await store.get("auth:a:session") is None)
+    await store.delete("auth:a:session")
+    check("delete of a missing key", await store.get("auth:a:session") is None)
+    await store.set("auth:a:short", "value", 1)
+    await store.set("auth:a:long", "value", 60)
+    await asyncio.sleep(1.1)
+    check("expires after its TTL", await store.get("auth:a:short") is None)
+    check("others outlive it", await store.get("auth:a:long") == "value")
+
+
+async def check_storage() -> None:
+    from supabase_auth_X_reflex.auth_state import ServerSessionStorage
+    from supabase_auth_X_reflex.session_store import get_session_store, session_key
+
+    print(f"ServerSessionStorage on {type(get_session_store()).__name__}")
+    storage = substate(new_tab(), ServerSessionStorage)
+    check("no session id before the first write", not storage._has_items())
+    check("nothing stored yet", await storage.get_item("session") is None)
+    await storage.set_item("session", "tokens")
+    session_id = storage.auth_session_id
+    check("first write mints a session id", bool(session_id))
+    check("item is read back", await storage.get_item("session") == "tokens")
+    check(
+        "item is kept under the session id",
+        await get_session_store().get(session_key(session_id, "session")) == "tokens",
+    )
+
+    other_storage = substate(new_tab(), ServerSessionStorage)
+    await other_storage.set_item("session", "other tokens")
+    check("sessions are separate", await storage.get_item("session") == "tokens")
+
+    await storage.remove_item("session")
+    check("item is removed", await storage.get_item("session") is None)
+    check(
+        "other session is untouched",
+        await other_storage.get_item("session") == "other tokens",
+    )
+    storage.start_new_session()
+    await storage.set_item("session", "new tokens")
+    check("a new session gets a new id", storage.auth_session_id != session_id)
+    await get_session_store().close()
+
+
+async def run(sock: socket.socket, store_url: str) -> int:
+    from supabase_auth_X_reflex.session_store import (
+        MemorySessionStore,
+        RedisSessionStore,
+    )
+
+    stub = RespStub()
+    server = await stub.start(sock=sock)
+
+    await check_store(MemorySessionStore())
+    redis_store = RedisSessionStore(store_url)
+    await check_store(redis_store)
+    await redis_store.close()
+    await check_storage()
+
+    server.close()
+    await server.wait_closed()
+    print(f"RESP commands: {dict(stub.calls)}")
+    if failures:
+        print(f"{len(failures)} check(s) failed")
+        return 1
+    return 0
+
+
+def main() -> int:
+    sock, address = bind_local()
+    store_url = f"redis://{address}"
+    configure(NO_SERVER_URL, AUTH_STORAGE="server", AUTH_SESSION_STORE_URL=store_url)
+    return asyncio.run(run(sock, store_url))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
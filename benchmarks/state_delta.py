@@ -0,0 +1,73 @@
+"""Measure what each auth form UI event costs the state manager and the browser.
+
+Run from the repository root:
+
+    python -m benchmarks.state_delta
+
+For each event, prints the size of the delta sent to the browser and the
+serialized size of every substate the event dirtied, which is what the state
+manager writes back (to Redis or disk) after the event. Exits non-zero if an
+event dirties any substate but `AuthFormState`, e.g. because form state and
+identity state were merged into one state again.
+"""
+
+import sys
+from typing import Iterator
+
+import reflex as rx
+from reflex.utils import format
+
+from supabase_auth_X_reflex.auth_state import AuthFormState
+
+# (handler name, args) as the auth forms trigger them.
+UI_EVENTS = [
+    ("toggle_show_password", ()),
+    ("toggle_show_password", ()),
+    ("set_signup_view", ()),
+    ("set_forgot_password_view", ()),
+    ("set_login_view", ()),
+]
+
+
+def all_states(state: rx.State) -> Iterator[rx.State]:
+    yield state
+    for substate in state.substates.values():
+        yield from all_states(substate)
+
+
+def process(root: rx.State) -> tuple[int, dict[str, int]]:
+    """The event's delta size and the written size of each substate it dirtied.
+
+    Works like the state manager after an event: the delta is sent, the
+    states are cleaned, and only substates that were touched are serialized.
+    """
+    delta = len(format.json_dumps(root.get_delta()))
+    root._clean()
+    written = {}
+    for state in all_states(root):
+        if state._get_was_touched():
+            state._was_touched = False
+            written[type(state).__name__] = len(state._serialize())
+    return delta, written
+
+
+def main() -> int:
+    root = rx.State(_reflex_internal_init=True)
+    form = root.get_substate(AuthFormState.get_full_name().split("."))
+    process(root)
+
+    failed = False
+    for name, args in UI_EVENTS:
+        getattr(form, name)(*args)
+        delta, written = process(root)
+        others = set(written) - {AuthFormState.__name__}
+        failed |= bool(others)
+        states = ", ".join(f"{state} {size} bytes" for state, size in written.items())
+        print(f"{name:>26}: delta {delta:>4} bytes, writes {states}")
+        if others:
+            print(f"{'':>26}  FAIL: also dirtied {', '.join(sorted(others))}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
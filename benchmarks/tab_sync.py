@@ -0,0 +1,286 @@
+"""Count auth server calls per browser with several tabs open.
+
+Run from the repository root:
+
+    python -m benchmarks.tab_sync --browsers 10 --tabs 4
+
+Each simulated browser has one cookie jar shared by its tabs, and each tab
+sends its events through Reflex's own event processing, as the websocket
+does: page loads, a sign in in the first tab, a reload of the others, some
+background refreshes, the first tab closing, more refreshes, a reload of
+all tabs and a sign out in the second tab. BroadcastChannel messages reach
+the browser's other tabs, and a Web Lock stand-in gives one tab per browser
+the lead. The run is repeated with `AUTH_TAB_SYNC` off and on, each in its
+own process, and reports the GoTrue calls per browser for each step, the
+ones rejected (refresh tokens used twice) and how many tabs show the right
+user.
+
+Tokens are refreshed every few seconds instead of hourly; the refresh
+jitter and reuse window keep their default 3:1 ratio.
+"""
+
+import argparse
+import asyncio
+import os
+import re
+import socket
+import subprocess
+import sys
+import uuid
+
+from benchmarks.gotrue_stub import TOKEN_LIFETIME, GoTrueStub
+from benchmarks.harness import bind_local, configure
+
+# Seconds between refreshes of a session, give or take a second.
+REFRESH_PERIOD = 3.0
+
+
+async def measure(args, sock: socket.socket, base_url: str) -> None:
+    from reflex.app import process
+    from reflex.event import Event
+    from reflex.state import OnLoadInternalState, State, UpdateVarsInternalState
+    from reflex.utils import prerequisites
+
+    from supabase_auth_X_reflex.auth_state import (
+        SYNCED_COOKIES,
+        TAB_SYNC,
+        AuthFormState,
+        AuthState,
+        AuthStorage,
+    )
+    from supabase_auth_X_reflex.supabase_client import close_http_client
+
+    app = prerequisites.get_app().app
+    app._enable_state()
+    stub = GoTrueStub(base_url, args.latency_ms)
+    server = await stub.start(sock=sock)
+
+    cookie_vars = {
+        name: f"{(AuthState if name == 'auth_claims' else AuthStorage).get_full_name()}.{name}"
+        for name in SYNCED_COOKIES
+    }
+    cookie_names = {var: name for name, var in cookie_vars.items()}
+    # Events sent to the tabs and not processed yet.
+    pending = [0]
+    idle = asyncio.Event()
+    idle.set()
+    tabs_by_sid: dict[str, "Tab"] = {}
+
+    class Namespace:
+        """Delivers out-of-band updates, from background tasks, to the tabs."""
+
+        token_to_sid: dict[str, str] = {}
+
+        async def emit_update(self, update, sid: str) -> None:
+            if sid in tabs_by_sid:
+                tabs_by_sid[sid].receive(update)
+
+        async def emit(self, *args, **kwargs) -> None:
+            raise AssertionError("state was lost")
+
+    app.event_namespace = Namespace()
+
+    class Tab:
+        def __init__(self, browser: "Browser"):
+            self.browser = browser
+            self.token = str(uuid.uuid4())
+            self.sid = str(uuid.uuid4())
+            self.queue: asyncio.Queue = asyncio.Queue()
+            self.user_id = None
+            tabs_by_sid[self.sid] = self
+            Namespace.token_to_sid[self.token] = self.sid
+            self.worker = asyncio.create_task(self.run())
+
+        def send(self, name: str, payload: dict | None = None) -> None:
+            pending[0] += 1
+            idle.clear()
+            self.queue.put_nowait((name, payload or {}))
+
+        def load(self) -> None:
+            """Hydrate with the browser's cookies and run the page's on_load."""
+            self.send(f"{State.get_full_name()}.hydrate")
+            self.send(
+                f"{UpdateVarsInternalState.get_full_name()}.update_vars_internal",
+                {"vars": {var: self.browser.jar.get(name, "") for name, var in cookie_vars.items()}},
+            )
+            self.send(f"{OnLoadInternalState.get_full_name()}.on_load_internal")
+
+        async def run(self) -> None:
+            while True:
+                name, payload = await self.queue.get()
+                event = Event(
+                    token=self.token,
+                    name=name,
+                    payload=payload,
+                    router_data={"pathname": "/", "query": {}, "asPath": "/"},
+                )
+                try:
+                    async for update in process(app, event, self.sid, {}, "127.0.0.1"):
+                        self.receive(update)
+                finally:
+                    pending[0] -= 1
+                    if not pending[0]:
+                        idle.set()
+
+        def receive(self, update) -> None:
+            # What the frontend does with a state update: store cookies, show
+            # the user, then run the events it carries.
+            for substate, delta in update.delta.items():
+                for var, value in delta.items():
+                    name = cookie_names.get(f"{substate}.{var}")
+                    if name:
+                        self.browser.jar[name] = value
+                    elif substate == AuthState.get_full_name() and var == "user_id":
+                        self.user_id = value
+            for event in update.events:
+                if event.name == "_call_script":
+                    change = re.search(r'postMessage\("(\w+)"\)', event.payload["javascript_code"])
+                    if change:
+                        self.browser.broadcast(self, change.group(1))
+                elif event.name == "_redirect":
+                    self.send(f"{OnLoadInternalState.get_full_name()}.on_load_internal")
+                elif not event.name.startswith("_"):
+                    self.send(event.name, event.payload)
+
+        def close(self) -> None:
+            self.worker.cancel()
+            # Events it never got to are dropped with the tab.
+            pending[0] -= self.queue.qsize()
+            if not pending[0]:
+                idle.set()
+            del tabs_by_sid[self.sid]
+            del Namespace.token_to_sid[self.token]
+
+    class Browser:
+        def __init__(self):
+            self.jar: dict = {}
+            self.tabs: list[Tab] = []
+
+        def open_tab(self) -> Tab:
+            tab = Tab(self)
+            self.tabs.append(tab)
+            tab.load()
+            if TAB_SYNC and len(self.tabs) == 1:
+                tab.send(f"{AuthState.get_full_name()}.lead_refresh")
+            return tab
+
+        def close_tab(self, tab: Tab) -> None:
+            leader = self.tabs[0] is tab
+            self.tabs.remove(tab)
+            tab.close()
+            if TAB_SYNC and leader and self.tabs:
+                self.tabs[0].send(f"{AuthState.get_full_name()}.lead_refresh")
+
+        def broadcast(self, sender: Tab, change: str) -> None:
+            if not TAB_SYNC:
+                return
+            cookies = {name: self.jar.get(name, "") for name in SYNCED_COOKIES}
+            for tab in self.tabs:
+                if tab is not sender:
+                    tab.send(
+                        f"{AuthState.get_full_name()}.sync_session",
+                        {"change": change, "cookies": cookies},
+                    )
+
+    browsers = [Browser() for _ in range(args.browsers)]
+
+    async def step(name: str, expect_signed_in: bool, wait: float = 0.0) -> None:
+        stub.calls.clear()
+        stub.rejected = 0
+        await asyncio.sleep(wait)
+        # Until no tab has an event left, including ones other tabs sent.
+        await idle.wait()
+        calls = sum(stub.calls.values()) / len(browsers)
+        tabs = [tab for b in browsers for tab in b.tabs]
+        right = sum(bool(tab.user_id) == expect_signed_in for tab in tabs)
+        print(
+            f"  {name:<24} GoTrue calls {calls:>4.1f} per browser, "
+            f"{stub.rejected / len(browsers):>3.1f} rejected | "
+            f"tabs showing the right user {right:>3}/{len(tabs)}"
+        )
+
+    print(f"tab sync {os.environ['AUTH_TAB_SYNC']}:")
+    for browser in browsers:
+        for _ in range(args.tabs):
+            browser.open_tab()
+    await step("open tabs", expect_signed_in=False)
+
+    for i, browser in enumerate(browsers):
+        browser.tabs[0].send(
+            f"{AuthFormState.get_full_name()}.handle_submit",
+            {"form_data": {"email": f"user{i}@tabs.test", "password": "pw"}},
+        )
+    await step("sign in in one tab", expect_signed_in=True)
+
+    for browser in browsers:
+        for tab in browser.tabs[1:]:
+            tab.load()
+    await step("reload the other tabs", expect_signed_in=True)
+
+    wait = args.refresh_seconds
+    await step(f"{wait:g} s of refreshes", expect_signed_in=True, wait=wait)
+
+    for browser in browsers:
+        browser.close_tab(browser.tabs[0])
+    await step(f"close 1st tab, {wait:g} s more", expect_signed_in=True, wait=wait)
+
+    for browser in browsers:
+        for tab in browser.tabs:
+            tab.load()
+    await step("reload all tabs", expect_signed_in=True)
+
+    for browser in browsers:
+        browser.tabs[0].send(f"{AuthState.get_full_name()}.sign_out")
+    await step("sign out in one tab", expect_signed_in=False)
+
+    for browser in browsers:
+        for tab in list(browser.tabs):
+            browser.close_tab(tab)
+    await close_http_client()
+    server.close()
+    await server.wait_closed()
+
+
+def child(args) -> None:
+    sock, address = bind_local()
+    base_url = f"http://{address}"
+    configure(
+        base_url,
+        # Background refreshes are what this run counts.
+        AUTH_BACKGROUND_REFRESH="true",
+        AUTH_VERIFY_MODE="remote",
+        AUTH_THROTTLE="false",
+        LOG_LEVEL="WARNING",
+        TELEMETRY_ENABLED="false",
+        STATE_MANAGER_MODE="memory",
+        AUTH_REFRESH_LEAD_TIME=str(TOKEN_LIFETIME - REFRESH_PERIOD),
+        AUTH_REFRESH_JITTER="0.6",
+        SUPABASE_REFRESH_REUSE_WINDOW="0.2",
+    )
+    asyncio.run(measure(args, sock, base_url))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--browsers", type=int, default=10)
+    parser.add_argument("--tabs", type=int, default=4)
+    parser.add_argument("--refresh-seconds", type=float, default=10.0)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child(args)
+        return
+
+    print(f"{args.browsers} browsers with {args.tabs} tabs each")
+    # The mode is read at import time, so each one runs in its own process.
+    for mode in ("false", "true"):
+        subprocess.run(
+            [sys.executable, "-m", "benchmarks.tab_sync", "--child", *sys.argv[1:]],
+            env={**os.environ, "AUTH_TAB_SYNC": mode},
+            check=True,
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,51 @@
+import atexit
 import logging
-from supabase_auth_X_reflex.logging_info import CustomFormatter
+import logging.handlers
+import queue
+from supabase_auth_X_reflex.logging_info import (
+    CustomFormatter,
+    JsonFormatter,
+    LocalQueueHandler,
+    SamplingFilter,
+    parse_sample_rates,
+)
 import os
 
 
+# "text" for colored, human-readable lines or "json" for one object per line.
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "text")
+LOG_SAMPLE_RATES = os.environ.get(
+    "LOG_SAMPLE_RATES", "storage.read=0.01,storage.write=0.1,check_auth.success=0.1"
+)
+
+
 def configure_logger():
+    """Route all logging through a queue to a stream handler.
+
+    Called by the app module, so importing the package or one of its modules
+    (tools, benchmarks, compiles) leaves logging untouched.
+    """
     logger = logging.getLogger()  # root logger
-    log_level = logging.getLevelName(os.environ.get("LOG_LEVEL", "DEBUG"))
+    log_level = logging.getLevelName(os.environ.get("LOG_LEVEL", "INFO"))
     logger.setLevel(log_level)
 
     stream_handler = logging.StreamHandler()
-    stream_handler.setLevel(os.environ.get("LOG_LEVEL", logging.DEBUG))
-    stream_handler.setFormatter(CustomFormatter())
+    stream_handler.setFormatter(
+        JsonFormatter() if LOG_FORMAT == "json" else CustomFormatter()
+    )
 
-    logger.addHandler(stream_handler)
-
-    logging.getLogger("watchfiles.main").setLevel(logging.WARNING)
+    # Handlers only enqueue records; formatting and writing to the stream
+    # happen on the listener's thread, off the event loop.
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(
+        log_queue, stream_handler, respect_handler_level=True
+    )
+    listener.start()
+    atexit.register(listener.stop)
 
+    queue_handler = LocalQueueHandler(log_queue)
+    # Sampled-out records are dropped before they are queued.
+    queue_handler.addFilter(SamplingFilter(parse_sample_rates(LOG_SAMPLE_RATES)))
+    logger.addHandler(queue_handler)
 
-configure_logger()
+    logging.getLogger("watchfiles.main").setLevel(logging.WARNING)
@@ -1,5 +1,6 @@
 import reflex as rx
-from supabase_auth_X_reflex.auth_state import AuthState
+from supabase_auth_X_reflex.auth_state import AuthFormState
+from supabase_auth_X_reflex.oauth_route import oauth_start_url
 
 
 def email_input() -> rx.Component:
@@ -8,7 +9,30 @@ def email_input() -> rx.Component:
             rx.text("Email address", size="2", margin_bottom="2px", weight="bold"),
             rx.hstack(
                 rx.input(
-                    on_change=AuthState.set_email,
+                    name="email",
+                    type="email",
+                    box_shadow="none",
+                    style={"outline": "none"},
+                    width="100%",
+                ),
+                border=f"1px solid {rx.color('gray', 5)}",
+                border_radius="10px",
+                align_items="center",
+                justify="center",
+                _focus_within={"box_shadow": f"0 0 5px {rx.color('gray', 7)}"},
+            ),
+            width="100%",
+        ),
+    )
+
+
+def full_name_input() -> rx.Component:
+    return (
+        rx.box(
+            rx.text("First name", size="2", margin_bottom="2px", weight="bold"),
+            rx.hstack(
+                rx.input(
+                    name="full_name",
                     box_shadow="none",
                     style={"outline": "none"},
                     width="100%",
@@ -31,9 +55,9 @@ def password_input() -> rx.Component:
             rx.hstack(
                 rx.input(
                     type=rx.cond(
-                        AuthState.input_password_type == "text", "text", "password"
+                        AuthFormState.input_password_type == "text", "text", "password"
                     ),
-                    on_change=AuthState.set_password,
+                    name="password",
                     box_shadow="none",
                     style={"outline": "none"},
                     width="100%",
@@ -45,7 +69,7 @@ def password_input() -> rx.Component:
                     size=25,
                     color=rx.color("gray", 9),
                     padding_right="10px",
-                    on_click=AuthState.toggle_show_password,
+                    on_click=AuthFormState.toggle_show_password,
                 ),
                 border=f"1px solid {rx.color('gray', 5)}",
                 border_radius="10px",
@@ -54,11 +78,11 @@ def password_input() -> rx.Component:
                 _focus_within={"box_shadow": f"0 0 5px {rx.color('gray', 7)}"},
             ),
             rx.cond(
-                AuthState.view_type == "login",
+                AuthFormState.view_type == "login",
                 rx.box(
                     rx.link(
                         "Forgot Password?",
-                        on_click=AuthState.set_forgot_password_view,
+                        on_click=AuthFormState.set_forgot_password_view,
                         color=rx.color("accent", 9),
                         size="2",
                         margin_bottom="3",
@@ -79,9 +103,9 @@ def continue_button() -> rx.Component:
                 "Continue",
                 rx.icon(tag="play", size=10, stroke_width=3),
                 type="submit",
-                on_click=AuthState.start_loading(),
+                on_click=AuthFormState.start_loading(),
                 width="100%",
-                loading=AuthState.is_loading,
+                loading=AuthFormState.is_loading,
             ),
             width="100%",
             margin_bottom="3",
@@ -90,24 +114,31 @@ def continue_button() -> rx.Component:
 
 
 def google_button() -> rx.Component:
-    return (
-        rx.button(
-            rx.image(src="/google.svg"),
-            "Continue with Google",
-            color=rx.color("gray", 11),
-            background_color=rx.color("gray", 1),
-            border=f"1px solid {rx.color('gray', 5)}",
-            on_click=[
-                AuthState.start_loading(),
-                AuthState.sign_in_with_oauth("google"),
-            ],
-            _hover={
-                "background_color": rx.color("gray", 3),
-                "transition": "all 0.2s ease-in-out",
-            },
-            box_shadow=f"0 0 5px {rx.color('gray', 5)}",
-        ),
+    href = oauth_start_url("google")
+    # With the OAuth route, a plain link: the backend answers with a redirect
+    # to Google, without a websocket round trip first. Its cookies don't
+    # reach a frontend on another host, so there the sign in starts over the
+    # websocket instead.
+    events = {} if href else {
+        "on_click": [
+            AuthFormState.start_loading(),
+            AuthFormState.sign_in_with_oauth("google"),
+        ]
+    }
+    button = rx.button(
+        rx.image(src="/google.svg"),
+        "Continue with Google",
+        color=rx.color("gray", 11),
+        background_color=rx.color("gray", 1),
+        border=f"1px solid {rx.color('gray', 5)}",
+        _hover={
+            "background_color": rx.color("gray", 3),
+            "transition": "all 0.2s ease-in-out",
+        },
+        box_shadow=f"0 0 5px {rx.color('gray', 5)}",
+        **events,
     )
+    return rx.link(button, href=href) if href else button
 
 
 def or_separator() -> rx.Component:
@@ -149,14 +180,14 @@ def login_component() -> rx.Component:
                         continue_button(),
                         spacing="6",
                     ),
-                    on_submit=AuthState.handle_submit,
+                    on_submit=AuthFormState.handle_submit,
                 ),
                 rx.separator(),
                 rx.text(
                     "Don't have an account? ",
                     rx.link(
                         "Sign Up",
-                        on_click=AuthState.set_signup_view,
+                        on_click=AuthFormState.set_signup_view,
                         color=rx.color(
                             "accent",
                             9,
@@ -200,37 +231,22 @@ def signup_component() -> rx.Component:
                 ),
                 google_button(),
                 or_separator(),
-                rx.box(
-                    rx.text("First name", size="2", margin_bottom="2px", weight="bold"),
-                    rx.hstack(
-                        rx.input(
-                            on_change=AuthState.set_full_name,
-                            box_shadow="none",
-                            style={"outline": "none"},
-                            width="100%",
-                        ),
-                        border=f"1px solid {rx.color('gray', 5)}",
-                        border_radius="10px",
-                        align_items="center",
-                        justify="center",
-                        _focus_within={"box_shadow": f"0 0 5px {rx.color('gray', 7)}"},
-                    ),
-                ),
                 rx.form(
                     rx.vstack(
+                        full_name_input(),
                         email_input(),
                         password_input(),
                         continue_button(),
                         spacing="6",
                     ),
-                    on_submit=AuthState.handle_submit,
+                    on_submit=AuthFormState.handle_submit,
                 ),
                 rx.separator(),
                 rx.text(
                     "Already have an account? ",
                     rx.link(
                         "Sign In",
-                        on_click=AuthState.set_login_view,
+                        on_click=AuthFormState.set_login_view,
                         color=rx.color(
                             "accent",
                             9,
@@ -278,7 +294,7 @@ def forgot_password_component() -> rx.Component:
                         continue_button(),
                         spacing="6",
                     ),
-                    on_submit=AuthState.handle_submit,
+                    on_submit=AuthFormState.handle_submit,
                 ),
                 or_separator(),
                 google_button(),
@@ -287,7 +303,7 @@ def forgot_password_component() -> rx.Component:
                     "",
                     rx.link(
                         "Back",
-                        on_click=AuthState.set_login_view,
+                        on_click=AuthFormState.set_login_view,
                         color=rx.color(
                             "accent",
                             9,
@@ -314,10 +330,10 @@ def forgot_password_component() -> rx.Component:
 
 def auth_component() -> rx.Component:
     return rx.cond(
-        AuthState.view_type == "login",
+        AuthFormState.view_type == "login",
         login_component(),
         rx.cond(
-            AuthState.view_type == "signup",
+            AuthFormState.view_type == "signup",
             signup_component(),
             forgot_password_component(),
         ),
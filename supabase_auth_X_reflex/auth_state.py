@@ -1,128 +1,805 @@
 import reflex as rx
-from typing import Optional
-from gotrue import SyncSupportedStorage
+from typing import TYPE_CHECKING, Optional
+import asyncio
+import functools
+import hashlib
+import json
 import logging
 import os
-from supabase import create_client, Client, ClientOptions
-import time
+import secrets
+from supabase_auth_X_reflex import claims_cookie, cookie_codec
+from supabase_auth_X_reflex.circuit_breaker import OPEN, auth_breaker
+from supabase_auth_X_reflex.metrics import auth_metrics, instrumented
+from supabase_auth_X_reflex.refresh_scheduler import (
+    BACKGROUND_REFRESH,
+    refresh_delay,
+    refresh_scheduler,
+    tab_connected,
+)
+from supabase_auth_X_reflex.session_cache import VerifiedSession, session_cache
+from supabase_auth_X_reflex.session_store import (
+    AUTH_STORAGE,
+    get_session_store,
+    item_ttl,
+    session_key,
+)
+from supabase_auth_X_reflex.single_flight import SingleFlight
+from supabase_auth_X_reflex.supabase_client import get_auth_client
+from supabase_auth_X_reflex.throttle import AUTH_THROTTLE, client_ip, login_throttle
+from supabase_auth_X_reflex.token_verifier import AUTH_VERIFY_MODE, token_verifier
+
+if TYPE_CHECKING:
+    from gotrue import AsyncGoTrueClient, Session
 
 logger = logging.getLogger(__name__)
 
 
-class ReflexCookieStorage(rx.State, SyncSupportedStorage):
-    """A storage implementation that uses Reflex's Cookie state to store session data."""
+def make_verified_session(
+    user_id: str, email: str | None, user_metadata: dict, expires_at: float
+) -> VerifiedSession:
+    return VerifiedSession(
+        user_id=user_id,
+        email=email,
+        user_name=(
+            user_metadata.get("full_name")
+            or user_metadata.get("name")
+            or (email or "").split("@")[0]
+        ),
+        expires_at=expires_at,
+    )
+
+
+AUTH_COOKIE_COMPRESS = os.environ.get("AUTH_COOKIE_COMPRESS", "true") == "true"
+# Seconds a completed sign in, sign up or password reset is handed to
+# identical submits from the same tab (double clicks, Enter plus click).
+SUBMIT_DEDUP_WINDOW = float(os.environ.get("AUTH_SUBMIT_DEDUP_WINDOW", "3"))
+
+# Share sign ins, token refreshes and sign outs between the tabs of a browser
+# over a BroadcastChannel, see `tab_sync.auth_tab_sync`.
+TAB_SYNC = os.environ.get("AUTH_TAB_SYNC", "true") == "true"
+TAB_SYNC_CHANNEL = "supabase-auth"
+
+submit_flight = SingleFlight(result_ttl=SUBMIT_DEDUP_WINDOW)
+# The own on_load events of protected pages, by page, which `require_auth`
+# only sends once the visitor is verified.
+protected_on_load: dict[str, list] = {}
+_suppressed_submits = {"sign_in": 0, "sign_up": 0, "reset_password": 0}
+
+
+def forget_submits(client_token: str) -> None:
+    """Stop handing a tab's completed submits to its later identical ones.
+
+    Called when the tab signs out, so signing in again with the same
+    credentials gets a new session instead of the one just revoked.
+    """
+    submit_flight.forget_where(lambda key: key[1] == client_token)
+
+
+def submit_stats() -> dict:
+    """Return how many auth submits ran and how many duplicates attached."""
+    return {
+        "calls": submit_flight.stats.leaders,
+        **{f"{op}_suppressed": n for op, n in _suppressed_submits.items()},
+    }
+
+
+# The cookie storage's vars, named like the cookies they are stored in.
+AUTH_COOKIE_NAMES = (
+    "auth_storage",
+    "auth_storage_1",
+    "auth_storage_2",
+    "auth_storage_3",
+)
+_decode_cookie = functools.lru_cache(maxsize=1024)(cookie_codec.decode)
+
+
+def encode_cookie_chunks(items: dict) -> list[str]:
+    """Encode storage items into one value per auth cookie, "" when unused."""
+    chunks = cookie_codec.split(cookie_codec.encode(items, AUTH_COOKIE_COMPRESS))
+    if len(chunks) > len(AUTH_COOKIE_NAMES):
+        raise ValueError(
+            f"Auth storage needs {len(chunks)} cookies, "
+            f"only {len(AUTH_COOKIE_NAMES)} are available"
+        )
+    return chunks + [""] * (len(AUTH_COOKIE_NAMES) - len(chunks))
+
+
+def broadcast_session_change(change: str) -> rx.event.EventSpec:
+    """Tell the browser's other tabs that this tab's session changed.
+
+    `change` is "login", "refresh" or "logout". The script runs after the
+    state update it comes with, so the other tabs find the new cookies set.
+    It posts through the tab's own `auth_tab_sync` channel when there is one,
+    which doesn't deliver the message back to this tab.
+    """
+    return rx.call_script(
+        "typeof BroadcastChannel !== 'undefined' && "
+        "(window.authTabSync?.receiver ?? "
+        f"new BroadcastChannel({json.dumps(TAB_SYNC_CHANNEL)}))"
+        f".postMessage({json.dumps(change)})"
+    )
+
+
+def oauth_redirect_url() -> str:
+    """Where the auth server sends users back to after an OAuth sign in."""
+    if os.getenv("LOCAL") == "true":
+        return "http://localhost:3000"
+    return f"https://{os.environ.get('DOMAIN')}"
+
+
+class ReflexCookieStorage(rx.State):
+    """A gotrue storage implementation that uses Reflex's Cookie state to store session data.
+
+    Items are stored in the compact `cookie_codec` format, split across up to
+    four cookies so large sessions stay below the browser's per-cookie limit.
+    """
 
     auth_storage: str = rx.Cookie("", name="auth_storage")
+    auth_storage_1: str = rx.Cookie("", name="auth_storage_1")
+    auth_storage_2: str = rx.Cookie("", name="auth_storage_2")
+    auth_storage_3: str = rx.Cookie("", name="auth_storage_3")
+
+    def _read_items(self) -> dict:
+        if not isinstance(self.auth_storage, str):
+            # Legacy single-cookie {"toplevel": {...}} dict.
+            return cookie_codec.decode(self.auth_storage)
+        raw = "".join(getattr(self, name) for name in AUTH_COOKIE_NAMES)
+        return _decode_cookie(raw)
+
+    def _has_items(self) -> bool:
+        """Whether anything is stored, without decoding the cookies."""
+        return bool(self.auth_storage)
+
+    def _write_items(self, items: dict) -> None:
+        # Only reassign cookies whose content changed, so unchanged chunks
+        # are not part of the state delta sent to the browser.
+        for name, chunk in zip(AUTH_COOKIE_NAMES, encode_cookie_chunks(items)):
+            if getattr(self, name) != chunk:
+                setattr(self, name, chunk)
 
     def get_item(self, key: str) -> str | None:
         """Get an item from storage."""
         try:
-            if not self.auth_storage:
-                return None
-            data = self.auth_storage
-            logger.info(f"Current keys in auth_storage: {list(self.auth_storage['toplevel'].keys())}")
-            return data["toplevel"].get(key)
+            items = self._read_items()
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "Current keys in auth_storage: %s",
+                    list(items),
+                    extra={"event": "storage.read"},
+                )
+            return items.get(key)
         except Exception as e:
-            logger.error(f"Error getting storage item: {e}. Key: {key}")
+            logger.error("Error getting storage item: %s. Key: %s", e, key)
             return None
 
     def set_item(self, key: str, value: str) -> None:
         """Set an item in storage."""
-        logger.info(f"Setting storage item: {key} = {value}")
+        # Values are tokens; only ever log their size.
+        logger.debug(
+            "Setting storage item: %s (%d chars)",
+            key,
+            len(value),
+            extra={"event": "storage.write"},
+        )
         try:
-            current_data = {"toplevel": {}}
-            if self.auth_storage and self.auth_storage["toplevel"]:
-                current_data = self.auth_storage
-            current_data["toplevel"][key] = value
-            self.auth_storage = current_data
-            logger.info(f"Current keys in auth_storage: {list(self.auth_storage['toplevel'].keys())}")
+            items = self._read_items()
+            if items.get(key) == value:
+                return
+            items = {**items, key: value}
+            self._write_items(items)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Current keys in auth_storage: %s", list(items))
         except Exception as e:
-            logger.error(f"Error setting storage item: {e}. Key: {key}, Value: {value}")
+            logger.error("Error setting storage item: %s. Key: %s", e, key)
 
     def remove_item(self, key: str) -> None:
         """Remove an item from storage."""
         try:
-            if not self.auth_storage:
-                return
-            current_data = self.auth_storage
-            if key in current_data["toplevel"]:
-                del current_data["toplevel"][key]
-                self.auth_storage = current_data
-            logger.info(f"Current keys in auth_storage: {list(self.auth_storage['toplevel'].keys())}")
+            items = self._read_items()
+            # Also clears cookies left holding a value that didn't decode.
+            if key in items or (not items and self._has_items()):
+                items = {k: v for k, v in items.items() if k != key}
+                self._write_items(items)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Current keys in auth_storage: %s", list(items))
+        except Exception as e:
+            logger.error("Error removing storage item: %s. Key: %s", e, key)
+
+
+class ServerSessionStorage(rx.State):
+    """A gotrue storage implementation that keeps session data in the server-side store.
+
+    The browser only holds an opaque session id in the `auth_session_id`
+    cookie; the tokens live in the session store and, with a Redis store, are
+    shared by all workers.
+    """
+
+    auth_session_id: str = rx.Cookie("", name="auth_session_id")
+
+    def start_new_session(self) -> None:
+        """Drop the current session id so the next write mints a fresh one.
+
+        Called before signing in, so a session id planted in the browser
+        beforehand never ends up pointing at the new session.
+        """
+        self.auth_session_id = ""
+
+    def _has_items(self) -> bool:
+        """Whether this browser has a server-side session at all."""
+        return bool(self.auth_session_id)
+
+    async def get_item(self, key: str) -> str | None:
+        """Get an item from storage."""
+        if not self.auth_session_id:
+            return None
+        try:
+            with auth_metrics.phase("storage"):
+                return await get_session_store().get(
+                    session_key(self.auth_session_id, key)
+                )
+        except Exception as e:
+            logger.error("Error getting storage item: %s. Key: %s", e, key)
+            return None
+
+    async def set_item(self, key: str, value: str) -> None:
+        """Set an item in storage."""
+        if not self.auth_session_id:
+            self.auth_session_id = secrets.token_urlsafe(32)
+        try:
+            with auth_metrics.phase("storage"):
+                await get_session_store().set(
+                    session_key(self.auth_session_id, key), value, item_ttl(key)
+                )
+        except Exception as e:
+            logger.error("Error setting storage item: %s. Key: %s", e, key)
+
+    async def remove_item(self, key: str) -> None:
+        """Remove an item from storage."""
+        if not self.auth_session_id:
+            return
+        try:
+            with auth_metrics.phase("storage"):
+                await get_session_store().delete(
+                    session_key(self.auth_session_id, key)
+                )
         except Exception as e:
-            logger.error(f"Error removing storage item: {e}. Key: {key}")
+            logger.error("Error removing storage item: %s. Key: %s", e, key)
 
 
-supabase_url: str = f"https://{os.environ.get('SUPABASE_IDENTIFIER')}.supabase.co"
-supabase_key: str = os.environ.get("SUPABASE_KEY")
+AuthStorage = (
+    ServerSessionStorage if AUTH_STORAGE == "server" else ReflexCookieStorage
+)
+# The cookies a change in another tab can update, named like their vars.
+SYNCED_COOKIES = (
+    ("auth_session_id",) if AUTH_STORAGE == "server" else AUTH_COOKIE_NAMES
+) + ("auth_claims",)
 
 
 class AuthState(rx.State):
-    """The app state."""
+    """The signed-in identity.
+
+    Form and UI state lives in `AuthFormState`, so typing, toggles and view
+    switches don't dirty (and re-serialize) this state.
+    """
 
     # Only store serializable data in state
     user_email: Optional[str] = None
     user_id: Optional[str] = None
-    email: str = ""
-    password: str = ""
-    full_name: str = ""
     user_name: Optional[str] = None
+    # Signed user data for the next page load, see `restore_session`.
+    auth_claims: str = rx.Cookie(
+        "", name="auth_claims", max_age=claims_cookie.CLAIMS_TTL
+    )
+    # Whether this tab runs its browser's background refresh. With tab sync,
+    # only the tab `lead_refresh` is called in does.
+    _refresh_leader: bool = not TAB_SYNC
+
+    async def get_supabase_client(
+        self, new_session: bool = False
+    ) -> "AsyncGoTrueClient":
+        """Get a Supabase auth client with the current session storage."""
+        with auth_metrics.phase("client"):
+            storage = await self.get_state(AuthStorage)
+            if new_session and isinstance(storage, ServerSessionStorage):
+                storage.start_new_session()
+            return get_auth_client(storage)
+
+    def restore_session(self):
+        """on_load: show a returning user's view from the claims cookie.
+
+        Runs before `check_auth`, so the signed-in view renders without
+        waiting for the session to be loaded and verified. If verification
+        then fails, `check_auth` clears the user again.
+        """
+        if claims_cookie.INSTANT_PAINT and not self.user_id and self.auth_claims:
+            claims = claims_cookie.read(self.auth_claims)
+            if claims:
+                self.set_user_data(claims)
+                # Guards that see the user already set won't start it.
+                if self._leads_refresh():
+                    return AuthState.keep_session_fresh
+
+    def _leads_refresh(self) -> bool:
+        return BACKGROUND_REFRESH and self._refresh_leader
+
+    def _session_changed(self, change: str) -> list:
+        """Events to send after this tab signed in, refreshed or signed out.
+
+        Starts the background refresh if this tab leads it, and tells the
+        browser's other tabs.
+        """
+        events = []
+        if change != "logout" and self._leads_refresh():
+            events.append(AuthState.keep_session_fresh)
+        if TAB_SYNC:
+            events.append(broadcast_session_change(change))
+        return events
+
+    def lead_refresh(self):
+        """Make this tab run the background refresh for its browser.
+
+        Called by `auth_tab_sync` in the one tab per browser that holds the
+        lead; the other tabs pick up its refreshes through `sync_session`.
+        """
+        if self._refresh_leader:
+            return
+        self._refresh_leader = True
+        if self.user_id and BACKGROUND_REFRESH:
+            return AuthState.keep_session_fresh
+
+    @instrumented("sync_session")
+    async def sync_session(self, change: str, cookies: dict):
+        """Follow a sign in, refresh or sign out made in another tab.
+
+        Called by `auth_tab_sync` with the browser's auth cookies, which the
+        other tab has already updated. The user is set from the session cache
+        that tab filled, so following it doesn't reach the auth server.
+        """
+        storage = await self.get_state(AuthStorage)
+        for name in SYNCED_COOKIES:
+            state = self if name == "auth_claims" else storage
+            value = cookies.get(name) or ""
+            if getattr(state, name) != value:
+                setattr(state, name, value)
+
+        if change == "logout" or not storage._has_items():
+            refresh_scheduler.cancel(self.router.session.client_token)
+            forget_submits(self.router.session.client_token)
+            if self.user_id:
+                self.clear_user_data()
+                yield rx.redirect("/")
+            return
+
+        verified = None
+        try:
+            client = await self.get_supabase_client()
+            session = await client.get_session()
+            if session and session.access_token:
+                verified = await self._verify_session(client, session)
+        except Exception as e:
+            auth_metrics.record_error(e)
+            logger.warning(
+                "Could not load session changed in another tab: %s",
+                e,
+                extra={"event": "sync_session.error", "error_type": type(e).__name__},
+            )
+            return
+
+        if not verified:
+            self.clear_user_data()
+        elif verified.user_id != self.user_id:
+            self.set_user_data(verified)
+            if self._leads_refresh():
+                yield AuthState.keep_session_fresh
+
+    @instrumented("check_auth")
+    async def check_auth(self):
+        params = self.router.page.params
+        # Params can carry tokens and auth codes; only log their names.
+        logger.debug(
+            "check_auth params: %s",
+            list(params),
+            extra={"event": "check_auth.params"},
+        )
+        # Parse URL fragment if params are empty
+        if not params and "#" in self.router.page.raw_path:
+            fragment = self.router.page.raw_path.split("#", 1)[1]
+            params = dict(param.split("=") for param in fragment.split("&"))
+
+        if "error_description" in params:
+            readable_error = params["error_description"].replace("+", " ")
+            yield rx.toast.error(readable_error, position="top-right", duration=10000)
+
+        is_callback = "code" in params or "access_token" in params
+        storage = await self.get_state(AuthStorage)
+        if not is_callback and not storage._has_items():
+            # Anonymous visitor: there is no session to load or verify, so
+            # skip building a client. Vars are only reset when set, so the
+            # load sends no state delta.
+            if self.user_id:
+                self.clear_user_data()
+            if params:
+                yield rx.redirect("/")
+            return
+
+        session = None
+        client = await self.get_supabase_client()
+
+        # Handle signup confirmation
+        if "access_token" in params and "refresh_token" in params:
+            try:
+                await client.set_session(
+                    params["access_token"], params["refresh_token"]
+                )
+
+                # Remove the tokens from the URL
+                yield [*self._session_changed("login"), rx.redirect("/")]
+            except Exception as e:
+                auth_metrics.record_error(e)
+                logger.error(
+                    "Error setting session from URL params: %s",
+                    e,
+                    extra={"event": "check_auth.error", "error_type": type(e).__name__},
+                )
+                yield rx.toast.error(
+                    "Error confirming signup. Please try again.",
+                    position="top-right",
+                    duration=10000,
+                )
+
+        # Handle OAuth callback
+        if "code" in params:
+            try:
+                # Create a new session with the auth code. The exchange also
+                # saves the session to storage.
+                auth_response = await client.exchange_code_for_session(
+                    {"auth_code": params["code"]}
+                )
+
+                # The auth server just issued this session for this user, so
+                # hydrate from the response instead of validating it again.
+                session, user = auth_response.session, auth_response.user
+                verified = make_verified_session(
+                    user.id, user.email, user.user_metadata, session.expires_at or 0
+                )
+                session_cache.put(session.access_token, verified)
+                self.set_user_data(verified)
+
+                logger.info(
+                    "Session created from OAuth callback",
+                    extra={"event": "oauth.callback", "user_id": user.id},
+                )
+
+                # Remove the code from the URL
+                yield [*self._session_changed("login"), rx.redirect("/")]
+                return
+            except Exception as e:
+                auth_metrics.record_error(e)
+                # Log detailed error information
+                logger.error(
+                    "Error exchanging code for session: %s",
+                    e,
+                    exc_info=True,
+                    extra={
+                        "event": "oauth.callback.error",
+                        "params": list(params),
+                        "error_type": type(e).__name__,
+                    },
+                )
+
+        try:
+            session = await client.get_session()
+        except Exception as e:
+            # An expired session could not be refreshed (e.g. the auth server
+            # is down); the stored session is kept for the next page load.
+            auth_metrics.record_error(e)
+            logger.warning(
+                "Could not load session: %s",
+                e,
+                extra={"event": "check_auth.error", "error_type": type(e).__name__},
+            )
+            self.clear_user_data()
+            return
+
+        if session and session.access_token:
+            try:
+                verified = await self._verify_session(client, session)
+                if verified:
+                    self.set_user_data(verified)
+                    logger.info(
+                        "Session verified",
+                        extra={"event": "check_auth.success", "user_id": verified.user_id},
+                    )
+                    if self._leads_refresh():
+                        yield AuthState.keep_session_fresh
+                else:
+                    self.clear_user_data()
+            except Exception as e:
+                auth_metrics.record_error(e)
+                logger.error(
+                    "Error getting user: %s",
+                    e,
+                    extra={"event": "check_auth.error", "error_type": type(e).__name__},
+                )
+                # pass
+                self.clear_user_data()
+        else:
+            self.clear_user_data()
+            # Only redirect to clean up the URL; redirecting from a clean "/"
+            # would load the page and run check_auth again, in a loop.
+            if params:
+                yield rx.redirect("/")
+
+    @instrumented("require_auth")
+    async def require_auth(self, redirect_to: str = "/", page: str = ""):
+        """on_load guard of protected pages.
+
+        Signed-out visitors are sent to `redirect_to`. The decision comes from
+        the session cache and local token checks, so moving between protected
+        pages doesn't reach the auth server; it is only asked on a miss.
+        The page's own on_load events, registered in `protected_on_load`
+        under `page`, are only sent once the visitor is verified.
+        """
+        verified = None
+        try:
+            client = await self.get_supabase_client()
+            session = await client.get_session()
+            if session and session.access_token:
+                verified = await self._verify_session(client, session)
+        except Exception as e:
+            auth_metrics.record_error(e)
+            logger.warning(
+                "Could not authorize page load: %s",
+                e,
+                extra={"event": "require_auth.error", "error_type": type(e).__name__},
+            )
+
+        if not verified:
+            self.clear_user_data()
+            yield rx.redirect(redirect_to)
+            return
+        # Only touch the vars when the user changed, so navigating between
+        # protected pages sends no state delta.
+        events = list(protected_on_load.get(page, ()))
+        if verified.user_id != self.user_id:
+            self.set_user_data(verified)
+            if self._leads_refresh():
+                events.insert(0, AuthState.keep_session_fresh)
+        if events:
+            yield events
+
+    async def _verify_session(
+        self, client: "AsyncGoTrueClient", session: "Session"
+    ) -> VerifiedSession | None:
+        """Verify a session, using the session cache and local checks first."""
+        verified = session_cache.get(session.access_token)
+        if verified:
+            return verified
+
+        claims = None
+        # While the auth server is failing, verify locally in any mode
+        # rather than waiting on it.
+        if AUTH_VERIFY_MODE == "local" or auth_breaker.is_open:
+            claims = await token_verifier.verify(session.access_token)
+
+        if claims:
+            verified = make_verified_session(
+                claims["sub"],
+                claims.get("email"),
+                claims.get("user_metadata") or {},
+                claims["exp"],
+            )
+        elif auth_breaker.state == OPEN:
+            return None
+        else:
+            # Half-open, the breaker lets one trial call through to close it.
+            response = await client.get_user(session.access_token)
+            if not (response and response.user):
+                return None
+            verified = make_verified_session(
+                response.user.id,
+                response.user.email,
+                response.user.user_metadata,
+                session.expires_at or 0,
+            )
+
+        session_cache.put(session.access_token, verified)
+        return verified
+
+    @rx.event(background=True)
+    async def keep_session_fresh(self):
+        """Refresh this tab's session shortly before it expires.
+
+        Runs as a background task so foreground handlers find a fresh token in
+        the cookie instead of refreshing it in the user's critical path. With
+        tab sync, only the leading tab of a browser runs it and hands each
+        refresh to the others.
+        """
+        client_token = self.router.session.client_token
+        task = asyncio.current_task()
+        if not refresh_scheduler.claim(client_token, task):
+            return
+        try:
+            while True:
+                async with self:
+                    client = await self.get_supabase_client()
+                    session = await client.get_session()
+                if not session or not session.expires_at:
+                    return
+
+                await asyncio.sleep(refresh_delay(session.expires_at))
+
+                # Stop once the tab is closed. With cookie storage its cookies
+                # never reach the browser, so a refresh would rotate away the
+                # token the other tabs hold; with server storage it would keep
+                # the session alive, and its slot taken, with no tab left. The
+                # tab that leads next, or the next page load, refreshes instead.
+                if not tab_connected(client_token):
+                    return
+
+                async with self:
+                    client = await self.get_supabase_client()
+                    current = await client.get_session()
+                    # Someone else (sign out, another refresh) changed the
+                    # session while we were sleeping; start over with it.
+                    if not current or current.access_token != session.access_token:
+                        continue
+                    response = await client.refresh_session(current.refresh_token)
+                    # The auth server just issued this token; the other tabs
+                    # and the next page load take it without verifying it.
+                    if response.session and response.user:
+                        session_cache.put(
+                            response.session.access_token,
+                            make_verified_session(
+                                response.user.id,
+                                response.user.email,
+                                response.user.user_metadata,
+                                response.session.expires_at or 0,
+                            ),
+                        )
+                logger.debug("Refreshed session in the background")
+                if TAB_SYNC:
+                    yield broadcast_session_change("refresh")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.warning(f"Background session refresh failed: {e}")
+        finally:
+            refresh_scheduler.release(client_token, task)
+
+    def set_user_data(self, verified: VerifiedSession):
+        self.user_email = verified.email
+        self.user_id = verified.user_id
+        self.user_name = verified.user_name
+        if claims_cookie.INSTANT_PAINT and claims_cookie.needs_renewal(
+            self.auth_claims, verified
+        ):
+            self.auth_claims = claims_cookie.sign(verified)
+
+    def clear_user_data(self):
+        self.user_email = None
+        self.user_id = None
+        self.user_name = None
+        if self.auth_claims:
+            self.auth_claims = ""
+
+    @instrumented("sign_out")
+    async def sign_out(self):
+        refresh_scheduler.cancel(self.router.session.client_token)
+        forget_submits(self.router.session.client_token)
+        try:
+            client = await self.get_supabase_client()
+            session = await client.get_session()
+            if session:
+                session_cache.invalidate(session.access_token)
+            await client.sign_out()
+        except Exception as e:
+            auth_metrics.record_error(e)
+            logger.error(f"Error signing out: {e}")
+        finally:
+            self.clear_user_data()
+            yield [*self._session_changed("logout"), rx.redirect("/")]
+
+
+class AuthFormState(rx.State):
+    """Transient state of the login, signup and forgot-password forms.
+
+    Credentials are never stored here: they arrive with the form submit and
+    are only passed on to the auth server.
+    """
+
     view_type: str = "login"
     input_password_type: str = "password"
     is_loading: bool = False
 
-    async def get_supabase_client(self) -> Client:
-        """Get a Supabase client with the current session storage."""
-        reflex_cookie_storage = await self.get_state(ReflexCookieStorage)
-        client = create_client(
-            supabase_url, supabase_key, ClientOptions(storage=reflex_cookie_storage)
+    def _allow_attempt(self, email: str) -> bool:
+        """Apply the per-IP and per-account login throttle."""
+        if not AUTH_THROTTLE:
+            return True
+        ip = client_ip(
+            self.router.session.client_ip, self.router_data.get("headers", {})
         )
-        return client
+        return login_throttle.allow(ip, email)
+
+    def _submit_key(self, operation: str, *inputs: str) -> tuple[str, str, str]:
+        """Key a submit by operation, tab and inputs, hashing the credentials."""
+        digest = hashlib.sha256("\0".join(inputs).encode()).hexdigest()
+        return operation, self.router.session.client_token, digest
+
+    def _is_duplicate(self, key: tuple[str, str, str]) -> bool:
+        """Whether the submit attaches to a pending or just completed one.
+
+        Duplicates don't count against the login throttle.
+        """
+        if not submit_flight.pending(key):
+            return False
+        _suppressed_submits[key[0]] += 1
+        return True
 
     def toggle_show_password(self):
         self.input_password_type = (
             "password" if self.input_password_type == "text" else "text"
         )
 
-    def set_full_name(self, full_name: str):
-        self.full_name = full_name
-
-    def handle_submit(self, form_data: dict):
+    async def handle_submit(self, form_data: dict):
+        # The inputs are uncontrolled: their values only reach the server
+        # here, once per submit, instead of as one event per keystroke.
         self.is_loading = True
-        time.sleep(0.2)
-
+        email = form_data.get("email", "")
         if self.view_type == "login":
-            return self.sign_in()
+            events = self.sign_in(email, form_data.get("password", ""))
         elif self.view_type == "signup":
-            return self.sign_up()
+            events = self.sign_up(
+                email, form_data.get("password", ""), form_data.get("full_name", "")
+            )
         elif self.view_type == "forgot_password":
-            return self.reset_password()
+            events = self.reset_password(email)
+        else:
+            return
+        async for event in events:
+            yield event
 
-    async def sign_up(self):
+    @instrumented("sign_up")
+    async def sign_up(self, email: str, password: str, full_name: str):
+        key = self._submit_key("sign_up", email, password, full_name)
+        if not self._is_duplicate(key) and not self._allow_attempt(email):
+            self.is_loading = False
+            yield rx.toast.error(
+                "Too many attempts. Please wait a minute and try again.",
+                position="top-right",
+                duration=10000,
+            )
+            return
         try:
             if os.environ.get("LOCAL"):
                 redirect_to = f"http://{os.environ.get('DOMAIN')}"
             else:
                 redirect_to = f"https://{os.environ.get('DOMAIN')}"
 
-            client = await self.get_supabase_client()
-            response = client.auth.sign_up(
-                {
-                    "email": self.email,
-                    "password": self.password,
-                    "options": {
-                        "data": {
-                            "full_name": self.full_name,
+            auth = await self.get_state(AuthState)
+
+            async def sign_up():
+                client = await auth.get_supabase_client()
+                return await client.sign_up(
+                    {
+                        "email": email,
+                        "password": password,
+                        "options": {
+                            "data": {
+                                "full_name": full_name,
+                            },
+                            "email_redirect_to": redirect_to,
                         },
-                        "email_redirect_to": redirect_to,
-                    },
-                }
-            )
+                    }
+                )
+
+            response = await submit_flight.run(key, sign_up)
         except Exception as e:
+            auth_metrics.record_error(e)
+            self.is_loading = False
             yield rx.toast.error(str(e), position="top-right", duration=10000)
             return
 
-        self.reset_form()
         self.is_loading = False
         yield rx.toast.success(
             "Check your email to verify your account and log in!",
@@ -139,34 +816,53 @@ class AuthState(rx.State):
     def set_forgot_password_view(self):
         self.view_type = "forgot_password"
 
-    def reset_form(self):
-        self.email = ""
-        self.password = ""
-        self.full_name = ""
-
-    async def sign_in(self):
-        try:
-            client = await self.get_supabase_client()
-            response = client.auth.sign_in_with_password(
-                {"email": self.email, "password": self.password}
+    @instrumented("sign_in")
+    async def sign_in(self, email: str, password: str):
+        key = self._submit_key("sign_in", email, password)
+        if not self._is_duplicate(key) and not self._allow_attempt(email):
+            self.is_loading = False
+            yield rx.toast.error(
+                "Too many attempts. Please wait a minute and try again.",
+                position="top-right",
+                duration=10000,
             )
+            return
+        try:
+            auth = await self.get_state(AuthState)
+
+            async def sign_in():
+                # A fresh server-side session only for the call that signs in.
+                client = await auth.get_supabase_client(new_session=True)
+                return await client.sign_in_with_password(
+                    {"email": email, "password": password}
+                )
+
+            response = await submit_flight.run(key, sign_in)
         except Exception as e:
+            auth_metrics.record_error(e)
             self.is_loading = False
             yield rx.toast.error(str(e), position="top-right", duration=10000)
             return
 
         self.is_loading = False
         if response.user:
-            self.user_email = response.user.email
-            self.user_id = response.user.id
-            self.user_name = (
-                response.user.user_metadata.get("full_name")
-                or response.user.user_metadata.get("name")
-                or response.user.email.split("@")[0]
+            verified = make_verified_session(
+                response.user.id,
+                response.user.email,
+                response.user.user_metadata,
+                response.session.expires_at if response.session else 0,
+            )
+            if response.session:
+                session_cache.put(response.session.access_token, verified)
+            auth.set_user_data(verified)
+            logger.info(
+                "Signed in with password",
+                extra={"event": "sign_in.success", "user_id": verified.user_id},
             )
 
-            self.email = ""
-            self.password = ""
+            events = auth._session_changed("login")
+            if events:
+                yield events
         else:
             yield rx.toast.error(
                 "Invalid email or password", position="top-right", duration=10000
@@ -176,26 +872,23 @@ class AuthState(rx.State):
         self.is_loading = True
         yield
 
+    @instrumented("sign_in_with_oauth")
     async def sign_in_with_oauth(self, provider: str):
         try:
-            redirect_to = (
-                "http://localhost:3000"
-                if os.getenv("LOCAL") == "true"
-                else f"https://{os.environ.get('DOMAIN')}"
-            )
-
             options = {
-                "redirect_to": redirect_to,
+                "redirect_to": oauth_redirect_url(),
             }
 
-            client = await self.get_supabase_client()
-            response = client.auth.sign_in_with_oauth(
+            auth = await self.get_state(AuthState)
+            client = await auth.get_supabase_client(new_session=True)
+            response = await client.sign_in_with_oauth(
                 {
                     "provider": provider,
                     "options": options,
                 }
             )
         except Exception as e:
+            auth_metrics.record_error(e)
             self.is_loading = False
             yield rx.toast.error(str(e), position="top-right", duration=10000)
             return
@@ -203,15 +896,30 @@ class AuthState(rx.State):
         self.is_loading = False
         yield rx.redirect(response.url)
 
-    async def reset_password(self):
-        try:
-            client = await self.get_supabase_client()
-            response = client.auth.reset_password_for_email(
-                self.email,
-                {
-                    "redirect_to": "http://localhost:3000/update-password",
-                },
+    @instrumented("reset_password")
+    async def reset_password(self, email: str):
+        key = self._submit_key("reset_password", email)
+        if not self._is_duplicate(key) and not self._allow_attempt(email):
+            self.is_loading = False
+            yield rx.toast.error(
+                "Too many attempts. Please wait a minute and try again.",
+                position="top-right",
+                duration=10000,
             )
+            return
+        try:
+            auth = await self.get_state(AuthState)
+
+            async def reset_password():
+                client = await auth.get_supabase_client()
+                return await client.reset_password_for_email(
+                    email,
+                    {
+                        "redirect_to": "http://localhost:3000/update-password",
+                    },
+                )
+
+            response = await submit_flight.run(key, reset_password)
 
             self.is_loading = False
             yield rx.toast.success(
@@ -220,113 +928,6 @@ class AuthState(rx.State):
                 duration=10000,
             )
         except Exception as e:
+            auth_metrics.record_error(e)
             self.is_loading = False
             yield rx.toast.error(str(e), position="top-right", duration=10000)
-
-    async def check_auth(self):
-        params = self.router.page.params
-        logger.info(f"Params: {params}")
-        # Parse URL fragment if params are empty
-        if not params and "#" in self.router.page.raw_path:
-            fragment = self.router.page.raw_path.split("#", 1)[1]
-            params = dict(param.split("=") for param in fragment.split("&"))
-
-        if "error_description" in params:
-            readable_error = params["error_description"].replace("+", " ")
-            yield rx.toast.error(readable_error, position="top-right", duration=10000)
-
-        session = None
-        client = await self.get_supabase_client()
-
-        # Handle signup confirmation
-        if "access_token" in params and "refresh_token" in params:
-            try:
-                client.auth.set_session(params["access_token"], params["refresh_token"])
-
-                # Remove the tokens from the URL
-                yield rx.redirect("/")
-            except Exception as e:
-                logger.error(f"Error setting session from URL params: {e}")
-                yield rx.toast.error(
-                    "Error confirming signup. Please try again.",
-                    position="top-right",
-                    duration=10000,
-                )
-
-        # Handle OAuth callback
-        if "code" in params:
-            logger.info(f"Code received: {params['code']}")
-            try:
-                # Log the request details
-                logger.info(
-                    f"Attempting to exchange code for session with params: {params}"
-                )
-
-                # Create a new session with the auth code
-                auth_response = client.auth.exchange_code_for_session(
-                    {"auth_code": params["code"]}
-                )
-
-                client.auth.set_session(
-                    auth_response.session.access_token,
-                    auth_response.session.refresh_token,
-                )
-
-                # Log successful session creation
-                logger.info(f"Session created successfully: {auth_response.session}")
-
-                yield rx.redirect("/")
-            except Exception as e:
-                # Log detailed error information
-                logger.error(
-                    f"Error exchanging code for session: {e}",
-                    exc_info=True,
-                    extra={
-                        "params": params,
-                        "error_type": type(e).__name__,
-                    },
-                )
-
-        session = client.auth.get_session()
-
-        if session and session.access_token:
-            try:
-                response = client.auth.get_user(session.access_token)
-                if response and response.user:
-                    token_user_id = client.auth.get_user(session.access_token).user.id
-                    if token_user_id != response.user.id:
-                        raise Exception("User ID mismatch")
-
-                    self.user_email = response.user.email
-                    self.user_id = response.user.id
-                    self.user_name = (
-                        response.user.user_metadata.get("full_name")
-                        or response.user.user_metadata.get("name")
-                        or response.user.email.split("@")[0]
-                    )
-                else:
-                    # pass
-                    self.clear_user_data()
-            except Exception as e:
-                logger.error(f"Error getting user: {e}")
-                # pass
-                self.clear_user_data()
-        else:
-            # pass
-            self.clear_user_data()
-            yield rx.redirect("/")
-
-    def clear_user_data(self):
-        self.user_email = None
-        self.user_id = None
-        self.user_name = None
-
-    async def sign_out(self):
-        try:
-            client = await self.get_supabase_client()
-            client.auth.sign_out()
-        except Exception as e:
-            logger.error(f"Error signing out: {e}")
-        finally:
-            self.clear_user_data()
-            yield rx.redirect("/")
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+BREAKER_FAILURE_THRESHOLD = int(os.environ.get("AUTH_BREAKER_FAILURES", "5"))
+BREAKER_RESET_TIMEOUT = float(os.environ.get("AUTH_BREAKER_RESET_TIMEOUT", "30"))
+# Seconds each auth server operation may take, e.g. "user=2,token=5".
+# Operations are named after the first segment of the GoTrue path.
+TIMEOUT_DEFAULT = float(os.environ.get("AUTH_TIMEOUT_DEFAULT", "5"))
+TIMEOUTS = os.environ.get("AUTH_TIMEOUTS", "user=2,logout=2,jwks=2")
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+
+
+def _parse_timeouts(spec: str) -> dict[str, float]:
+    timeouts = {}
+    for item in spec.split(","):
+        if item.strip():
+            operation, seconds = item.split("=", 1)
+            timeouts[operation.strip()] = float(seconds)
+    return timeouts
+
+
+_timeouts = _parse_timeouts(TIMEOUTS)
+
+
+def operation_timeout(operation: str) -> float:
+    return _timeouts.get(operation, TIMEOUT_DEFAULT)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling the auth server while the circuit is open."""
+
+    status = 503
+
+    def __init__(self):
+        super().__init__(
+            "The authentication service is temporarily unavailable. "
+            "Please try again in a moment."
+        )
+
+
+class OperationTimeoutError(Exception):
+    """Raised when the auth server does not answer within the timeout."""
+
+    status = 0
+
+
+@dataclass
+class BreakerStats:
+    successes: int = 0
+    failures: int = 0
+    timeouts: int = 0
+    short_circuited: int = 0
+    opened: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "successes": self.successes,
+            "failures": self.failures,
+            "timeouts": self.timeouts,
+            "short_circuited": self.short_circuited,
+            "opened": self.opened,
+        }
+
+
+def _is_failure(error: BaseException) -> bool:
+    """Whether an error means the auth server is unhealthy.
+
+    Client errors such as a wrong password are answers, not failures.
+    """
+    # Imported here so the breaker doesn't load gotrue; any error gotrue
+    # raised means it is already imported.
+    from gotrue.errors import AuthRetryableError
+
+    if isinstance(error, (asyncio.TimeoutError, httpx.TransportError)):
+        return True
+    if isinstance(error, AuthRetryableError):
+        return True
+    status = getattr(error, "status", None)
+    if status is None and isinstance(error, httpx.HTTPStatusError):
+        status = error.response.status_code
+    return isinstance(status, int) and status >= 500
+
+
+class CircuitBreaker:
+    """Stops calling the auth server after repeated failures.
+
+    After `failure_threshold` consecutive failures the circuit opens and
+    calls fail fast with CircuitOpenError. Once `reset_timeout` seconds have
+    passed, a single trial call is let through (half-open); its outcome
+    closes the circuit again or keeps it open for another period.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.stats = BreakerStats()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if (
+            self._state == OPEN
+            and time.monotonic() - self._opened_at >= self.reset_timeout
+        ):
+            return HALF_OPEN
+        return self._state
+
+    @property
+    def is_open(self) -> bool:
+        return self.state != CLOSED
+
+    def _open(self) -> None:
+        if self._state != OPEN:
+            self.stats.opened += 1
+            logger.warning(
+                f"Auth server circuit opened after "
+                f"{self._consecutive_failures} consecutive failures"
+            )
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+
+    def _record_success(self) -> None:
+        self.stats.successes += 1
+        self._consecutive_failures = 0
+        if self._state != CLOSED:
+            logger.info("Auth server circuit closed")
+        self._state = CLOSED
+
+    def _record_failure(self) -> None:
+        self.stats.failures += 1
+        self._consecutive_failures += 1
+        if self._state != CLOSED or (
+            self._consecutive_failures >= self.failure_threshold
+        ):
+            self._open()
+
+    async def call(
+        self, fn: Callable[[], Awaitable[Any]], timeout: float = TIMEOUT_DEFAULT
+    ) -> Any:
+        """Run `fn` within `timeout` seconds, unless the circuit is open."""
+        state = self.state
+        trial = state == HALF_OPEN
+        if state == OPEN or (trial and self._trial_in_flight):
+            self.stats.short_circuited += 1
+            raise CircuitOpenError()
+
+        self._trial_in_flight = self._trial_in_flight or trial
+        try:
+            result = await asyncio.wait_for(fn(), timeout)
+        except asyncio.TimeoutError as e:
+            self.stats.timeouts += 1
+            self._record_failure()
+            raise OperationTimeoutError(
+                f"Auth server did not answer within {timeout:g}s"
+            ) from e
+        except Exception as e:
+            if _is_failure(e):
+                self._record_failure()
+            else:
+                self._record_success()
+            raise
+        else:
+            self._record_success()
+            return result
+        finally:
+            if trial:
+                self._trial_in_flight = False
+
+    def stats_dict(self) -> dict:
+        return {
+            **self.stats.as_dict(),
+            "open": int(self.state == OPEN),
+            "half_open": int(self.state == HALF_OPEN),
+        }
+
+
+auth_breaker = CircuitBreaker()
@@ -0,0 +1,97 @@
+"""Signed identity claims that let a returning user's page render at once.
+
+The claims cookie holds the user id, email, display name and an expiry as
+`<payload>.<signature>`: unpadded URL-safe base64 of compact JSON, and an
+HMAC-SHA256 over it. It is only a rendering hint, never a credential:
+`check_auth` still verifies the session and downgrades the view if that
+fails.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import logging
+import os
+import secrets
+import time
+
+from supabase_auth_X_reflex.session_cache import VerifiedSession
+
+logger = logging.getLogger(__name__)
+
+CLAIMS_TTL = int(os.environ.get("AUTH_CLAIMS_TTL", str(7 * 24 * 3600)))
+_secret = os.environ.get("AUTH_CLAIMS_SECRET") or os.environ.get("SUPABASE_JWT_SECRET")
+
+# Render the signed-in view from the claims cookie before check_auth is done.
+INSTANT_PAINT = os.environ.get("AUTH_INSTANT_PAINT", "false") == "true"
+if INSTANT_PAINT and not _secret:
+    # Every process would sign with a key of its own and reject the cookies
+    # of the others, then reissue them on nearly every load.
+    logger.warning(
+        "AUTH_INSTANT_PAINT needs AUTH_CLAIMS_SECRET or SUPABASE_JWT_SECRET; "
+        "instant paint is disabled"
+    )
+    INSTANT_PAINT = False
+
+
+def _signing_key() -> bytes:
+    if not _secret:
+        # Instant paint is off, so nothing is signed with it.
+        return secrets.token_bytes(32)
+    # Derive a key of its own, so the claims can't be mistaken for tokens
+    # signed with the same secret.
+    return hmac.new(_secret.encode(), b"auth-claims-cookie", hashlib.sha256).digest()
+
+
+_key = _signing_key()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _signature(payload: str) -> str:
+    return _b64encode(hmac.new(_key, payload.encode(), hashlib.sha256).digest())
+
+
+def sign(verified: VerifiedSession, ttl: int = CLAIMS_TTL) -> str:
+    """Return the cookie value for a verified session, valid for `ttl` seconds."""
+    claims = {
+        "sub": verified.user_id,
+        "email": verified.email,
+        "name": verified.user_name,
+        "exp": int(time.time()) + ttl,
+    }
+    payload = _b64encode(json.dumps(claims, separators=(",", ":")).encode())
+    return f"{payload}.{_signature(payload)}"
+
+
+def read(value: str) -> VerifiedSession | None:
+    """Return the identity in a cookie value, or None if forged or expired."""
+    payload, _, signature = value.partition(".")
+    if not signature or not hmac.compare_digest(signature, _signature(payload)):
+        return None
+    try:
+        claims = json.loads(base64.urlsafe_b64decode(payload + "=" * (-len(payload) % 4)))
+    except ValueError:
+        return None
+    if claims.get("exp", 0) <= time.time():
+        return None
+    return VerifiedSession(
+        user_id=claims["sub"],
+        email=claims.get("email"),
+        user_name=claims.get("name"),
+        expires_at=claims["exp"],
+    )
+
+
+def needs_renewal(value: str, verified: VerifiedSession) -> bool:
+    """Whether to reissue the cookie: changed identity, or half its TTL used."""
+    claims = read(value) if value else None
+    return (
+        claims is None
+        or (claims.user_id, claims.email, claims.user_name)
+        != (verified.user_id, verified.email, verified.user_name)
+        or claims.expires_at - time.time() < CLAIMS_TTL / 2
+    )
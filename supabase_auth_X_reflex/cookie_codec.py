@@ -0,0 +1,81 @@
+"""Compact encoding for the auth items kept in browser cookies.
+
+An encoded value is `<version><flag><payload>`, where the payload is the items
+dict as compact JSON, optionally zlib-compressed, in unpadded URL-safe base64.
+Base64 only uses cookie-safe characters, so browsers send it without any
+percent-encoding, and it can be cut into chunks at any position.
+"""
+
+import base64
+import json
+import logging
+import zlib
+
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = "1"
+FLAG_JSON = "j"
+FLAG_ZLIB = "z"
+# Browsers cap a cookie (name, value and attributes) at 4096 bytes.
+CHUNK_SIZE = 3800
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+
+def encode(items: dict[str, str], compress: bool = True) -> str:
+    """Encode the items, compressing them only when that makes them smaller."""
+    if not items:
+        return ""
+    raw = json.dumps(items, separators=(",", ":")).encode()
+    flag, payload = FLAG_JSON, raw
+    if compress:
+        compressed = zlib.compress(raw, 6)
+        if len(compressed) < len(raw):
+            flag, payload = FLAG_ZLIB, compressed
+    return FORMAT_VERSION + flag + _b64encode(payload)
+
+
+def _decode(value: str | dict) -> dict[str, str]:
+    if isinstance(value, dict):
+        return dict(value.get("toplevel") or {})
+    if value.startswith("{"):
+        return dict(json.loads(value).get("toplevel") or {})
+    if value[0] != FORMAT_VERSION:
+        raise ValueError(f"unknown format version {value[0]!r}")
+    payload = _b64decode(value[2:])
+    if value[1] == FLAG_ZLIB:
+        payload = zlib.decompress(payload)
+    elif value[1] != FLAG_JSON:
+        raise ValueError(f"unknown flag {value[1]!r}")
+    items = json.loads(payload)
+    if not isinstance(items, dict):
+        raise ValueError("payload is not an object")
+    return items
+
+
+def decode(value: str | dict) -> dict[str, str]:
+    """Decode a cookie value written by `encode` or by the legacy format.
+
+    The legacy format is the `{"toplevel": {...}}` dict the storage used to
+    keep in a single cookie. Values that can't be decoded (a truncated or
+    tampered cookie, another app's cookie of the same name) are logged and
+    yield no items, so the next write replaces them.
+    """
+    if not value:
+        return {}
+    try:
+        return _decode(value)
+    except (ValueError, TypeError, AttributeError, zlib.error) as e:
+        logger.warning(f"Ignoring undecodable auth cookie: {e}")
+        return {}
+
+
+def split(value: str, chunk_size: int = CHUNK_SIZE) -> list[str]:
+    """Cut an encoded value into cookie-sized chunks."""
+    return [value[i : i + chunk_size] for i in range(0, len(value), chunk_size)]
@@ -0,0 +1,87 @@
+"""The GoTrue client classes, kept apart so gotrue is only imported on use.
+
+`supabase_client.get_auth_client` imports this module on its first call.
+"""
+
+import functools
+
+from gotrue import (
+    AsyncGoTrueAdminAPI,
+    AsyncGoTrueClient,
+    AsyncSupportedStorage,
+    AuthResponse,
+)
+from gotrue.errors import AuthRetryableError
+
+from supabase_auth_X_reflex.circuit_breaker import (
+    CircuitOpenError,
+    OperationTimeoutError,
+    auth_breaker,
+    operation_timeout,
+)
+from supabase_auth_X_reflex.metrics import auth_metrics
+from supabase_auth_X_reflex.session_cache import token_fingerprint
+from supabase_auth_X_reflex.supabase_client import refresh_flight
+
+
+class AsyncStorageAdapter(AsyncSupportedStorage):
+    """Expose a synchronous session storage to the async GoTrue client."""
+
+    def __init__(self, storage):
+        self._storage = storage
+
+    async def get_item(self, key: str) -> str | None:
+        with auth_metrics.phase("storage"):
+            return self._storage.get_item(key)
+
+    async def set_item(self, key: str, value: str) -> None:
+        with auth_metrics.phase("storage"):
+            self._storage.set_item(key, value)
+
+    async def remove_item(self, key: str) -> None:
+        with auth_metrics.phase("storage"):
+            self._storage.remove_item(key)
+
+
+class BreakerRequests:
+    """Runs every request of a GoTrue API class within its operation's
+    timeout budget and through the process-wide circuit breaker."""
+
+    async def _request(self, method, path, **kwargs):
+        operation = path.split("?", 1)[0].split("/", 1)[0]
+        try:
+            return await auth_breaker.call(
+                functools.partial(super()._request, method, path, **kwargs),
+                operation_timeout(operation),
+            )
+        except (CircuitOpenError, OperationTimeoutError) as e:
+            # A retryable error keeps gotrue from removing the stored
+            # session when a refresh can't reach the auth server.
+            raise AuthRetryableError(str(e), e.status) from e
+
+
+class PooledGoTrueAdminAPI(BreakerRequests, AsyncGoTrueAdminAPI):
+    """The admin API, which `sign_out` sends its logout request through."""
+
+
+class PooledGoTrueClient(BreakerRequests, AsyncGoTrueClient):
+    """GoTrue client whose token refreshes are shared across the process.
+
+    Concurrent refreshes of the same refresh token (several tabs, a reconnect
+    burst) result in a single call to the auth server; every caller still
+    saves the new session to its own storage. Every request, including the
+    ones made through `admin`, runs within its operation's timeout budget and
+    through the process-wide circuit breaker.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.admin = PooledGoTrueAdminAPI(
+            url=self._url, headers=self._headers, http_client=self._http_client
+        )
+
+    async def _refresh_access_token(self, refresh_token: str) -> AuthResponse:
+        return await refresh_flight.run(
+            token_fingerprint(refresh_token),
+            functools.partial(super()._refresh_access_token, refresh_token),
+        )
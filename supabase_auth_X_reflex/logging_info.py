@@ -1,4 +1,8 @@
+import json
 import logging
+import logging.handlers
+import random
+import time
 
 
 class CustomFormatter(logging.Formatter):
@@ -19,7 +23,82 @@ class CustomFormatter(logging.Formatter):
         logging.CRITICAL: bold_red + format + reset,
     }
 
+    def __init__(self):
+        super().__init__()
+        # One formatter per level, built once instead of once per record.
+        self._formatters = {
+            level: logging.Formatter(fmt) for level, fmt in self.FORMATS.items()
+        }
+        self._default_formatter = logging.Formatter()
+
     def format(self, record):
-        log_fmt = self.FORMATS.get(record.levelno)
-        formatter = logging.Formatter(log_fmt)
+        formatter = self._formatters.get(record.levelno, self._default_formatter)
         return formatter.format(record)
+
+
+class LocalQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler for a listener in the same process.
+
+    The stock `prepare` formats and copies every record so it can be pickled;
+    here the record is only frozen (arguments merged into the message) and
+    all formatting, tracebacks included, is left to the listener thread.
+    """
+
+    def prepare(self, record):
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with the same fields on every record.
+
+    `event`, `user_id`, `handler`, `duration_ms` and `error_type` are taken
+    from the record's `extra` and are null when a record doesn't set them.
+    """
+
+    FIELDS = ("event", "user_id", "handler", "duration_ms", "error_type")
+
+    def format(self, record):
+        entry = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created))
+            + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for field in self.FIELDS:
+            entry[field] = getattr(record, field, None)
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+            if entry["error_type"] is None:
+                entry["error_type"] = record.exc_info[0].__name__
+        return json.dumps(entry, default=str)
+
+
+def parse_sample_rates(spec: str) -> dict[str, float]:
+    """Parse `event=rate,...`, e.g. "storage.read=0.01,check_auth.success=0.1"."""
+    rates = {}
+    for item in spec.split(","):
+        if item.strip():
+            event, rate = item.split("=", 1)
+            rates[event.strip()] = float(rate)
+    return rates
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of the records of high-volume events.
+
+    Records without an `event`, events without a configured rate and any
+    record at WARNING or above are always kept.
+    """
+
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING:
+            return True
+        rate = self.rates.get(getattr(record, "event", None))
+        return rate is None or random.random() < rate
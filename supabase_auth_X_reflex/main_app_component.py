@@ -7,6 +7,20 @@ def mainApp() -> rx.Component:
         rx.vstack(
             rx.text("Congrats! You are logged in !"),
             rx.text(f"Your Email: {AuthState.user_email}"),
+            rx.link("Your account", href="/account"),
             rx.button("Logout", on_click=AuthState.sign_out),
         )
-    )
\ No newline at end of file
+    )
+
+
+def accountPage() -> rx.Component:
+    """Account details, a second page only signed-in users can see."""
+    return rx.center(
+        rx.vstack(
+            rx.heading("Account"),
+            rx.text(f"Name: {AuthState.user_name}"),
+            rx.text(f"Email: {AuthState.user_email}"),
+            rx.link("Back", href="/"),
+            rx.button("Logout", on_click=AuthState.sign_out),
+        )
+    )
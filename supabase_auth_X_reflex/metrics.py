@@ -0,0 +1,216 @@
+import bisect
+import contextvars
+import functools
+import hmac
+import inspect
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+
+logger = logging.getLogger(__name__)
+
+# Path of the scrape endpoint on the app; empty (the default) to disable it.
+METRICS_PATH = os.environ.get("AUTH_METRICS_PATH", "")
+# When set, scrapes must send it as "Authorization: Bearer <token>".
+METRICS_TOKEN = os.environ.get("AUTH_METRICS_TOKEN", "")
+# Upper bounds in seconds, as in Prometheus' default histogram buckets.
+BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95, 0.99)
+
+_current_handler: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "auth_handler", default="unknown"
+)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; observing is a bisect and two adds."""
+
+    __slots__ = ("counts", "count", "sum")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile by interpolating inside its bucket."""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            if seen + bucket_count >= rank and bucket_count:
+                lower = BUCKETS[i - 1] if i > 0 else 0.0
+                upper = BUCKETS[i] if i < len(BUCKETS) else BUCKETS[-1]
+                return lower + (upper - lower) * (rank - seen) / bucket_count
+            seen += bucket_count
+        return BUCKETS[-1]
+
+
+class AuthMetrics:
+    """Per-handler, per-phase latency histograms and error counts.
+
+    `handler()` times a whole handler and names it for the phases observed
+    while it runs: client construction, storage access and GoTrue calls.
+    Errors a handler catches itself are counted with `record_error`.
+    """
+
+    def __init__(self):
+        self.histograms: dict[tuple[str, str], Histogram] = {}
+        self.errors: dict[tuple[str, str], int] = {}
+
+    def observe(self, handler: str, phase: str, seconds: float) -> None:
+        histogram = self.histograms.get((handler, phase))
+        if histogram is None:
+            histogram = self.histograms[(handler, phase)] = Histogram()
+        histogram.observe(seconds)
+
+    def record_error(self, error: BaseException, handler: str | None = None) -> None:
+        key = (handler or self.current_handler(), type(error).__name__)
+        self.errors[key] = self.errors.get(key, 0) + 1
+
+    @contextmanager
+    def handler(self, name: str):
+        token = _current_handler.set(name)
+        start = time.perf_counter()
+        error_type = None
+        try:
+            yield
+        except Exception as e:
+            error_type = type(e).__name__
+            self.record_error(e, name)
+            raise
+        finally:
+            _current_handler.reset(token)
+            duration = time.perf_counter() - start
+            self.observe(name, "total", duration)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(
+                    "%s finished in %.1f ms",
+                    name,
+                    duration * 1000,
+                    extra={
+                        "event": "handler.done",
+                        "handler": name,
+                        "duration_ms": round(duration * 1000, 3),
+                        "error_type": error_type,
+                    },
+                )
+
+    @contextmanager
+    def phase(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(self.current_handler(), phase, time.perf_counter() - start)
+
+    @staticmethod
+    def current_handler() -> str:
+        return _current_handler.get()
+
+
+auth_metrics = AuthMetrics()
+
+
+def instrumented(name: str):
+    """Time an event handler as `name`, including the updates it yields.
+
+    The wrapper keeps the handler's signature, which Reflex inspects to
+    bind event arguments.
+    """
+
+    def decorator(fn):
+        if inspect.isasyncgenfunction(fn):
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                with auth_metrics.handler(name):
+                    async for event in fn(*args, **kwargs):
+                        yield event
+
+        else:
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                with auth_metrics.handler(name):
+                    return await fn(*args, **kwargs)
+
+        wrapper.__signature__ = inspect.signature(fn)
+        return wrapper
+
+    return decorator
+
+
+_stat_sources: dict[str, Callable[[], dict]] = {}
+
+
+def register_stats(prefix: str, source: Callable[[], dict]) -> None:
+    """Export the counters returned by `source` as `<prefix>_<name>` metrics."""
+    _stat_sources[prefix] = source
+
+
+def render_metrics() -> str:
+    """Render all metrics in the Prometheus text exposition format."""
+    lines = [
+        "# TYPE auth_handler_duration_seconds histogram",
+    ]
+    for (handler, phase), histogram in sorted(auth_metrics.histograms.items()):
+        labels = f'handler="{handler}",phase="{phase}"'
+        cumulative = 0
+        for bound, bucket_count in zip(BUCKETS, histogram.counts):
+            cumulative += bucket_count
+            lines.append(
+                f'auth_handler_duration_seconds_bucket{{{labels},le="{bound}"}} '
+                f"{cumulative}"
+            )
+        lines.append(
+            f'auth_handler_duration_seconds_bucket{{{labels},le="+Inf"}} '
+            f"{histogram.count}"
+        )
+        lines.append(f"auth_handler_duration_seconds_sum{{{labels}}} {histogram.sum}")
+        lines.append(
+            f"auth_handler_duration_seconds_count{{{labels}}} {histogram.count}"
+        )
+
+    lines.append("# TYPE auth_handler_duration_quantile_seconds gauge")
+    for (handler, phase), histogram in sorted(auth_metrics.histograms.items()):
+        for q in QUANTILES:
+            lines.append(
+                f"auth_handler_duration_quantile_seconds"
+                f'{{handler="{handler}",phase="{phase}",quantile="{q}"}} '
+                f"{histogram.quantile(q):.6f}"
+            )
+
+    lines.append("# TYPE auth_handler_errors_total counter")
+    for (handler, error_type), count in sorted(auth_metrics.errors.items()):
+        lines.append(
+            f'auth_handler_errors_total{{handler="{handler}",'
+            f'error_type="{error_type}"}} {count}'
+        )
+
+    for prefix, source in _stat_sources.items():
+        for name, value in source().items():
+            lines.append(f"{prefix}_{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+async def metrics_endpoint(request: Request) -> PlainTextResponse:
+    if METRICS_TOKEN and not hmac.compare_digest(
+        request.headers.get("authorization", "").encode(),
+        f"Bearer {METRICS_TOKEN}".encode(),
+    ):
+        return PlainTextResponse("Unauthorized", status_code=401)
+    return PlainTextResponse(
+        render_metrics(), media_type="text/plain; version=0.0.4"
+    )
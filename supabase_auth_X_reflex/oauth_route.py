@@ -0,0 +1,105 @@
+import logging
+import os
+import secrets
+from urllib.parse import urlencode, urlsplit
+
+from reflex.config import get_config
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, RedirectResponse
+
+from supabase_auth_X_reflex.auth_state import (
+    AUTH_COOKIE_NAMES,
+    encode_cookie_chunks,
+    oauth_redirect_url,
+)
+from supabase_auth_X_reflex.metrics import auth_metrics, instrumented
+from supabase_auth_X_reflex.session_store import (
+    AUTH_STORAGE,
+    get_session_store,
+    item_ttl,
+    session_key,
+)
+from supabase_auth_X_reflex.supabase_client import get_auth_client
+from supabase_auth_X_reflex.throttle import AUTH_THROTTLE, client_ip, login_throttle
+
+logger = logging.getLogger(__name__)
+
+# Links to `<path>/<provider>` start an OAuth sign in.
+OAUTH_PATH = os.environ.get("AUTH_OAUTH_PATH", "/auth/oauth")
+OAUTH_PROVIDERS = frozenset(
+    provider.strip()
+    for provider in os.environ.get("AUTH_OAUTH_PROVIDERS", "google").split(",")
+    if provider.strip()
+)
+TOO_MANY_ATTEMPTS = "Too many attempts. Please wait a minute and try again."
+
+
+def oauth_start_url(provider: str) -> str | None:
+    """The route's URL for `provider`, or None if the route can't be used.
+
+    The route's cookies are set for the backend's host, while `check_auth`
+    reads them on the frontend's. Cookies are shared between ports but not
+    hosts, so the route only works when both hosts are the same; otherwise
+    the sign in has to start with `AuthFormState.sign_in_with_oauth`.
+    """
+    config = get_config()
+    if urlsplit(config.api_url).hostname != urlsplit(config.deploy_url or "").hostname:
+        return None
+    return f"{config.api_url}{OAUTH_PATH}/{provider}"
+
+
+@instrumented("oauth_start")
+async def oauth_start(request: Request, provider: str):
+    """Redirect the browser to the provider's sign in page.
+
+    A plain link to this route replaces the websocket round trip of
+    `AuthFormState.sign_in_with_oauth`. The authorize URL is built without
+    calling the auth server; the PKCE verifier it needs on the way back is
+    stored as `check_auth` expects it: in the auth cookies, or in the session
+    store under a new session id, for `VERIFIER_TTL` seconds. Starts count
+    against the login throttle of the client's IP.
+    """
+    if provider not in OAUTH_PROVIDERS:
+        return PlainTextResponse("Unknown OAuth provider", status_code=404)
+    if AUTH_THROTTLE:
+        peer = request.client.host if request.client else ""
+        if not login_throttle.allow(client_ip(peer, request.headers), ""):
+            error = urlencode({"error_description": TOO_MANY_ATTEMPTS})
+            return RedirectResponse(f"{oauth_redirect_url()}/?{error}", status_code=302)
+
+    from gotrue import AsyncMemoryStorage
+
+    # Signing in with OAuth drops any current session, so the verifier is
+    # the only item left in storage afterwards.
+    storage = AsyncMemoryStorage()
+    try:
+        client = get_auth_client(storage)
+        response = await client.sign_in_with_oauth(
+            {"provider": provider, "options": {"redirect_to": oauth_redirect_url()}}
+        )
+    except Exception as e:
+        auth_metrics.record_error(e)
+        logger.error(
+            "Error starting OAuth sign in: %s",
+            e,
+            extra={"event": "oauth.start.error", "error_type": type(e).__name__},
+        )
+        error = urlencode({"error_description": "Could not start the sign in."})
+        return RedirectResponse(f"{oauth_redirect_url()}/?{error}", status_code=302)
+
+    redirect = RedirectResponse(response.url, status_code=302)
+    with auth_metrics.phase("storage"):
+        if AUTH_STORAGE == "server":
+            session_id = secrets.token_urlsafe(32)
+            store = get_session_store()
+            for key, value in storage.storage.items():
+                await store.set(session_key(session_id, key), value, item_ttl(key))
+            redirect.set_cookie("auth_session_id", session_id, samesite="lax")
+        else:
+            chunks = encode_cookie_chunks(storage.storage)
+            for name, chunk in zip(AUTH_COOKIE_NAMES, chunks):
+                if chunk:
+                    redirect.set_cookie(name, chunk, samesite="lax")
+                elif name in request.cookies:
+                    redirect.delete_cookie(name, samesite="lax")
+    return redirect
@@ -0,0 +1,56 @@
+import functools
+from typing import Callable
+
+import reflex as rx
+
+from supabase_auth_X_reflex.auth_state import AuthState, protected_on_load
+from supabase_auth_X_reflex.tab_sync import auth_tab_sync
+
+
+def protected(
+    route: str | None = None,
+    *,
+    redirect_to: str = "/",
+    on_load: list | None = None,
+    **page_kwargs,
+) -> Callable[[Callable[[], rx.Component]], Callable[[], rx.Component]]:
+    """Register a page that only signed-in users can see.
+
+    Works like `rx.page`, with `AuthState.restore_session` and
+    `AuthState.require_auth` run on load. The page's own `on_load` event
+    handlers are only sent by `require_auth`, once the visitor is verified,
+    so they never run for signed-out visitors. Those are redirected to
+    `redirect_to`, and the page content is only rendered once a user is set.
+    The page follows sign ins and sign outs in the browser's other tabs, see
+    `auth_tab_sync`.
+
+        @protected(route="/account", title="Account")
+        def account() -> rx.Component:
+            ...
+    """
+
+    def decorator(render_fn: Callable[[], rx.Component]):
+        @functools.wraps(render_fn)
+        def page() -> rx.Component:
+            return rx.fragment(
+                auth_tab_sync(),
+                rx.cond(
+                    AuthState.user_id,
+                    render_fn(),
+                    rx.center(rx.spinner(size="3"), height="100vh"),
+                ),
+            )
+
+        key = f"{render_fn.__module__}.{render_fn.__qualname__}"
+        protected_on_load[key] = list(on_load or [])
+        rx.page(
+            route=route,
+            on_load=[
+                AuthState.restore_session,
+                AuthState.require_auth(redirect_to, key),
+            ],
+            **page_kwargs,
+        )(page)
+        return page
+
+    return decorator
@@ -0,0 +1,92 @@
+import asyncio
+import logging
+import os
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+BACKGROUND_REFRESH = os.environ.get("AUTH_BACKGROUND_REFRESH", "true") == "true"
+REFRESH_LEAD_TIME = float(os.environ.get("AUTH_REFRESH_LEAD_TIME", "60"))
+REFRESH_JITTER = float(os.environ.get("AUTH_REFRESH_JITTER", "30"))
+MAX_SCHEDULED_REFRESHES = int(os.environ.get("AUTH_MAX_SCHEDULED_REFRESHES", "10000"))
+
+
+def refresh_delay(expires_at: float) -> float:
+    """Seconds to wait before refreshing a session that expires at `expires_at`.
+
+    The refresh is planned `REFRESH_LEAD_TIME` seconds ahead of expiry, pulled
+    forward by a random jitter so sessions created together don't all refresh
+    in the same instant.
+    """
+    delay = expires_at - time.time() - REFRESH_LEAD_TIME
+    return max(0.0, delay - random.uniform(0, REFRESH_JITTER))
+
+
+_tab_check_failed = False
+
+
+def tab_connected(client_token: str) -> bool:
+    """Whether a tab still has its websocket open.
+
+    Reflex has no public API for this, so the app's map of connected tokens
+    is read here and nowhere else. Should an upgrade move it, every tab
+    counts as connected, and closed tabs keep refreshing as they used to.
+    """
+    global _tab_check_failed
+    from reflex.utils.prerequisites import get_app
+
+    try:
+        return client_token in get_app().app.event_namespace.token_to_sid
+    except (AttributeError, TypeError) as e:
+        if not _tab_check_failed:
+            _tab_check_failed = True
+            logger.warning(f"Cannot tell whether tabs are still connected: {e}")
+        return True
+
+
+class RefreshScheduler:
+    """Keeps track of the background refresh task of each browser tab.
+
+    There is at most one task per client token and at most `max_entries`
+    tasks overall; tabs beyond that fall back to refreshing on demand.
+    """
+
+    def __init__(self, max_entries: int = MAX_SCHEDULED_REFRESHES):
+        self.max_entries = max_entries
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def claim(self, client_token: str, task: asyncio.Task) -> bool:
+        """Register `task` as the refresher for a tab.
+
+        Returns False if the tab already has a refresher or the scheduler is
+        full, in which case the caller should exit.
+        """
+        current = self._tasks.get(client_token)
+        if current is not None and not current.done():
+            return False
+        if current is None and len(self._tasks) >= self.max_entries:
+            logger.warning(
+                f"Not scheduling background token refresh: "
+                f"{len(self._tasks)} refreshes already scheduled"
+            )
+            return False
+        self._tasks[client_token] = task
+        return True
+
+    def release(self, client_token: str, task: asyncio.Task) -> None:
+        """Forget `task` once it finished, unless it was already replaced."""
+        if self._tasks.get(client_token) is task:
+            del self._tasks[client_token]
+
+    def cancel(self, client_token: str) -> None:
+        """Stop the background refresh of a tab, e.g. on sign out."""
+        task = self._tasks.pop(client_token, None)
+        if task is not None:
+            task.cancel()
+
+    def __len__(self) -> int:
+        return len(self._tasks)
+
+
+refresh_scheduler = RefreshScheduler()
@@ -0,0 +1,88 @@
+import hashlib
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+SESSION_CACHE_MAX_SIZE = int(os.environ.get("AUTH_SESSION_CACHE_SIZE", "10000"))
+
+
+@dataclass(frozen=True)
+class VerifiedSession:
+    """The identity data AuthState needs from a verified access token."""
+
+    user_id: str
+    email: str | None
+    user_name: str | None
+    expires_at: float
+
+
+@dataclass
+class SessionCacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    invalidations: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations,
+        }
+
+
+def token_fingerprint(access_token: str) -> str:
+    """Hash an access token so the raw token never becomes a cache key."""
+    return hashlib.sha256(access_token.encode()).hexdigest()
+
+
+class VerifiedSessionCache:
+    """In-process LRU cache of verified sessions, keyed by token fingerprint.
+
+    Entries are dropped when the access token expires, when the cache is full
+    (least recently used first) or when the session is signed out.
+    """
+
+    def __init__(self, max_size: int = SESSION_CACHE_MAX_SIZE):
+        self.max_size = max_size
+        self.stats = SessionCacheStats()
+        self._entries: OrderedDict[str, VerifiedSession] = OrderedDict()
+
+    def get(self, access_token: str) -> VerifiedSession | None:
+        key = token_fingerprint(access_token)
+        session = self._entries.get(key)
+        if session is None:
+            self.stats.misses += 1
+            return None
+        if session.expires_at <= time.time():
+            del self._entries[key]
+            self.stats.expirations += 1
+            self.stats.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.stats.hits += 1
+        return session
+
+    def put(self, access_token: str, session: VerifiedSession) -> None:
+        if session.expires_at <= time.time():
+            return
+        key = token_fingerprint(access_token)
+        self._entries[key] = session
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+            self.stats.evictions += 1
+
+    def invalidate(self, access_token: str) -> None:
+        if self._entries.pop(token_fingerprint(access_token), None) is not None:
+            self.stats.invalidations += 1
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+session_cache = VerifiedSessionCache()
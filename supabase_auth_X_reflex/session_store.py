@@ -0,0 +1,122 @@
+import abc
+import logging
+import os
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# "cookie" keeps the auth items in browser cookies, "server" keeps them in the
+# session store below and gives the browser only an opaque session id.
+AUTH_STORAGE = os.environ.get("AUTH_STORAGE", "cookie")
+# memory:// or a redis:// / rediss:// URL. Only Redis is shared by workers.
+SESSION_STORE_URL = os.environ.get("AUTH_SESSION_STORE_URL", "memory://")
+# Items expire this many seconds after they were last written. Refreshes
+# rewrite the session, so this bounds how long an idle session survives.
+SESSION_TTL = int(os.environ.get("AUTH_SESSION_TTL", str(7 * 24 * 3600)))
+# A PKCE verifier only has to last until the browser is back from the OAuth
+# provider. Anyone can have one stored, so it must not outlive that.
+VERIFIER_TTL = int(os.environ.get("AUTH_OAUTH_VERIFIER_TTL", "600"))
+MEMORY_STORE_MAX_SIZE = int(os.environ.get("AUTH_MEMORY_STORE_SIZE", "100000"))
+
+
+class SessionStore(abc.ABC):
+    """Async key-value store with per-key TTL for server-side auth items."""
+
+    @abc.abstractmethod
+    async def get(self, key: str) -> str | None: ...
+
+    @abc.abstractmethod
+    async def set(self, key: str, value: str, ttl: int) -> None: ...
+
+    @abc.abstractmethod
+    async def delete(self, key: str) -> None: ...
+
+    async def close(self) -> None:
+        pass
+
+
+class MemorySessionStore(SessionStore):
+    """In-process store; sessions are only visible to the worker that wrote them.
+
+    Expired keys are dropped when read, and the least recently written keys
+    are evicted once the store holds `max_size` of them.
+    """
+
+    def __init__(self, max_size: int = MEMORY_STORE_MAX_SIZE):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+    async def get(self, key: str) -> str | None:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+        return value
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    async def delete(self, key: str) -> None:
+        self._entries.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class RedisSessionStore(SessionStore):
+    """Store backed by any server speaking the Redis protocol."""
+
+    def __init__(self, url: str):
+        # redis is only needed when this backend is configured.
+        import redis.asyncio
+
+        self._redis = redis.asyncio.Redis.from_url(url, decode_responses=True)
+
+    async def get(self, key: str) -> str | None:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: str, ttl: int) -> None:
+        await self._redis.set(key, value, ex=ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(key)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def create_session_store(url: str = SESSION_STORE_URL) -> SessionStore:
+    """Create the session store configured by `url`."""
+    if url.startswith("memory://"):
+        return MemorySessionStore()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisSessionStore(url)
+    raise ValueError(f"Unsupported session store URL: {url!r}")
+
+
+_session_store: SessionStore | None = None
+
+
+def get_session_store() -> SessionStore:
+    """Return the process-wide session store, creating it on first use."""
+    global _session_store
+    if _session_store is None:
+        _session_store = create_session_store()
+        logger.info(f"Using {type(_session_store).__name__} for auth sessions")
+    return _session_store
+
+
+def session_key(session_id: str, key: str) -> str:
+    return f"auth:{session_id}:{key}"
+
+
+def item_ttl(key: str) -> int:
+    """Seconds a storage item is kept, short for PKCE verifiers."""
+    return VERIFIER_TTL if key.endswith("-code-verifier") else SESSION_TTL
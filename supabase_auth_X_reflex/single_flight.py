@@ -0,0 +1,92 @@
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Hashable
+
+
+@dataclass
+class SingleFlightStats:
+    leaders: int = 0
+    coalesced: int = 0
+
+    def as_dict(self) -> dict:
+        return {"leaders": self.leaders, "coalesced": self.coalesced}
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into a single call.
+
+    The first caller for a key runs the call; callers arriving while it is in
+    flight await the same result instead of starting their own. With
+    `result_ttl` set, a successful result is also handed to callers that
+    arrive shortly after it completed. Should the caller running the call be
+    cancelled, one of the waiting callers runs it instead.
+    """
+
+    def __init__(self, result_ttl: float = 0.0):
+        self.result_ttl = result_ttl
+        self.stats = SingleFlightStats()
+        self._in_flight: dict[Hashable, asyncio.Future] = {}
+        self._recent: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def _prune(self, now: float) -> None:
+        while self._recent:
+            key, (completed_at, _) = next(iter(self._recent.items()))
+            if now - completed_at < self.result_ttl:
+                break
+            del self._recent[key]
+
+    def pending(self, key: Hashable) -> bool:
+        """Whether a call for `key` would attach to an earlier one."""
+        self._prune(time.monotonic())
+        return key in self._in_flight or key in self._recent
+
+    async def run(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        now = time.monotonic()
+        self._prune(now)
+        if key in self._recent:
+            self.stats.coalesced += 1
+            return self._recent[key][1]
+
+        future = self._in_flight.get(key)
+        if future is not None:
+            self.stats.coalesced += 1
+            try:
+                return await asyncio.shield(future)
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # The caller running the call was cancelled, not this one:
+                # take the call over (or attach to whoever did first).
+                return await self.run(key, fn)
+
+        future = asyncio.get_running_loop().create_future()
+        self._in_flight[key] = future
+        self.stats.leaders += 1
+        try:
+            result = await fn()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            # Mark the exception as retrieved in case nobody else was waiting.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            if self.result_ttl > 0:
+                self._recent[key] = (time.monotonic(), result)
+            return result
+        finally:
+            del self._in_flight[key]
+
+    def forget(self, key: Hashable) -> None:
+        """Drop a remembered result so the next call for `key` runs again."""
+        self._recent.pop(key, None)
+
+    def forget_where(self, predicate: Callable[[Hashable], bool]) -> None:
+        """Drop the remembered results whose key matches `predicate`."""
+        for key in [key for key in self._recent if predicate(key)]:
+            del self._recent[key]
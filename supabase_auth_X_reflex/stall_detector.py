@@ -0,0 +1,89 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+
+logger = logging.getLogger(__name__)
+
+# On by default when logging at DEBUG level, i.e. during development.
+STALL_DETECTOR = (
+    os.environ.get(
+        "STALL_DETECTOR",
+        "true" if os.environ.get("LOG_LEVEL", "INFO") == "DEBUG" else "false",
+    )
+    == "true"
+)
+STALL_THRESHOLD_MS = float(os.environ.get("STALL_THRESHOLD_MS", "100"))
+
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def _blocking_handler(frame) -> str:
+    """Name the innermost function of this package on the blocked stack."""
+    stack = traceback.extract_stack(frame)
+    for entry in reversed(stack):
+        if os.path.abspath(entry.filename).startswith(_PACKAGE_DIR):
+            return f"{entry.name} ({os.path.basename(entry.filename)}:{entry.lineno})"
+    entry = stack[-1]
+    return f"{entry.name} ({entry.filename}:{entry.lineno})"
+
+
+class StallDetector:
+    """Log event handlers that hold the event loop longer than a threshold.
+
+    A coroutine on the loop records a heartbeat every few milliseconds, and a
+    watchdog thread checks it. When the heartbeat is late, the watchdog
+    samples the loop thread's stack to find the blocking handler, and logs it
+    with the total stall duration once the loop is responsive again.
+    """
+
+    def __init__(self, threshold_ms: float = STALL_THRESHOLD_MS):
+        self.threshold = threshold_ms / 1000
+        self.interval = min(self.threshold / 4, 0.05)
+        self.stalls = 0
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: int | None = None
+        self._stop = threading.Event()
+
+    def _watch(self) -> None:
+        handler = None
+        while not self._stop.wait(self.interval):
+            last_beat = self._last_beat
+            late = time.monotonic() - last_beat
+            if late > self.threshold:
+                if handler is None:
+                    frame = sys._current_frames().get(self._loop_thread_id)
+                    handler = _blocking_handler(frame) if frame else "<unknown>"
+                stalled_since = last_beat
+            elif handler is not None:
+                self.stalls += 1
+                duration_ms = (self._last_beat - stalled_since) * 1000
+                logger.warning(
+                    f"Event loop blocked for {duration_ms:.0f} ms by {handler}"
+                )
+                handler = None
+
+    async def run(self) -> None:
+        """Watch the running event loop until cancelled."""
+        self._loop_thread_id = threading.get_ident()
+        self._stop.clear()
+        watchdog = threading.Thread(
+            target=self._watch, name="stall-detector", daemon=True
+        )
+        watchdog.start()
+        logger.info(
+            f"Stall detector watching the event loop "
+            f"(threshold {self.threshold * 1000:.0f} ms)"
+        )
+        try:
+            while True:
+                self._last_beat = time.monotonic()
+                await asyncio.sleep(self.interval)
+        finally:
+            self._stop.set()
+
+
+stall_detector = StallDetector()
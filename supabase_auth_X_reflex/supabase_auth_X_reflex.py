@@ -3,30 +3,70 @@
 import reflex as rx
 
 from rxconfig import config
-from supabase_auth_X_reflex.auth_state import AuthState
+from supabase_auth_X_reflex import configure_logger
+from supabase_auth_X_reflex.auth_state import AuthState, submit_stats
 from supabase_auth_X_reflex.auth_component import auth_component
-from supabase_auth_X_reflex.main_app_component import mainApp
+from supabase_auth_X_reflex.circuit_breaker import auth_breaker
+from supabase_auth_X_reflex.main_app_component import accountPage, mainApp
+from supabase_auth_X_reflex.metrics import (
+    METRICS_PATH,
+    metrics_endpoint,
+    register_stats,
+)
+from supabase_auth_X_reflex.oauth_route import OAUTH_PATH, oauth_start
+from supabase_auth_X_reflex.protected import protected
+from supabase_auth_X_reflex.session_cache import session_cache
+from supabase_auth_X_reflex.stall_detector import STALL_DETECTOR, stall_detector
+from supabase_auth_X_reflex.supabase_client import pool_stats, refresh_stats
+from supabase_auth_X_reflex.tab_sync import auth_tab_sync
+from supabase_auth_X_reflex.throttle import login_throttle
+
+configure_logger()
 
 
 @rx.page(title="Reflex X Supabase Auth - Demo Repo")
 def index() -> rx.Component:
     return rx.theme(
         rx.toast.provider(),
+        auth_tab_sync(),
+        # A user can be set before hydration finishes, by restore_session.
         rx.cond(
-            AuthState.is_hydrated,
+            AuthState.user_id,
+            mainApp(),
             rx.cond(
-                AuthState.user_id,
-                mainApp(),
+                AuthState.is_hydrated,
                 auth_component(),
-            ),
-            rx.center(
-                rx.spinner(size="3"),
-                rx.text("Loading..."),
+                rx.center(
+                    rx.spinner(size="3"),
+                    rx.text("Loading..."),
+                ),
             ),
         ),
         accent_color="green",
     )
 
 
+@protected(route="/account", title="Account - Reflex X Supabase Auth")
+def account() -> rx.Component:
+    return rx.theme(
+        rx.toast.provider(),
+        accountPage(),
+        accent_color="green",
+    )
+
+
 app = rx.App()
-app.add_page(index, on_load=[AuthState.check_auth])
+app.add_page(index, on_load=[AuthState.restore_session, AuthState.check_auth])
+
+if STALL_DETECTOR:
+    app.register_lifespan_task(stall_detector.run)
+
+register_stats("auth_pool", pool_stats)
+register_stats("auth_refresh", refresh_stats)
+register_stats("auth_session_cache", session_cache.stats.as_dict)
+register_stats("auth_throttle", login_throttle.stats_dict)
+register_stats("auth_breaker", auth_breaker.stats_dict)
+register_stats("auth_submit", submit_stats)
+if METRICS_PATH:
+    app.api.add_api_route(METRICS_PATH, metrics_endpoint)
+app.api.add_api_route(f"{OAUTH_PATH}/{{provider}}", oauth_start)
@@ -0,0 +1,146 @@
+import inspect
+import logging
+import os
+import time
+from dataclasses import dataclass
+
+from typing import TYPE_CHECKING
+
+import httpx
+
+from supabase_auth_X_reflex.metrics import auth_metrics
+from supabase_auth_X_reflex.single_flight import SingleFlight
+
+if TYPE_CHECKING:
+    from supabase_auth_X_reflex.gotrue_client import PooledGoTrueClient
+
+logger = logging.getLogger(__name__)
+
+# SUPABASE_URL overrides the project URL, e.g. to point at a local GoTrue.
+supabase_url: str = (
+    os.environ.get("SUPABASE_URL")
+    or f"https://{os.environ.get('SUPABASE_IDENTIFIER')}.supabase.co"
+)
+supabase_key: str = os.environ.get("SUPABASE_KEY")
+
+POOL_MAX_CONNECTIONS = int(os.environ.get("SUPABASE_POOL_MAX_CONNECTIONS", "20"))
+POOL_MAX_KEEPALIVE = int(os.environ.get("SUPABASE_POOL_MAX_KEEPALIVE", "10"))
+POOL_KEEPALIVE_EXPIRY = float(os.environ.get("SUPABASE_POOL_KEEPALIVE_EXPIRY", "30"))
+# How long a completed refresh is handed to late callers presenting the same
+# (now rotated) refresh token, e.g. a second tab that read the old cookie.
+REFRESH_REUSE_WINDOW = float(os.environ.get("SUPABASE_REFRESH_REUSE_WINDOW", "10"))
+
+
+@dataclass
+class PoolStats:
+    """Counters for the shared connection pool."""
+
+    requests: int = 0
+    hits: int = 0
+    misses: int = 0
+
+    def as_dict(self) -> dict:
+        return {"requests": self.requests, "hits": self.hits, "misses": self.misses}
+
+
+_pool_stats = PoolStats()
+_http_client: httpx.AsyncClient | None = None
+
+
+async def _trace(event_name: str, info: dict) -> None:
+    # httpcore only opens a TCP connection when no idle keep-alive connection
+    # for the origin is available, so every connect is a pool miss.
+    if event_name == "connection.connect_tcp.complete":
+        _pool_stats.misses += 1
+        _pool_stats.hits -= 1
+
+
+async def _on_request(request: httpx.Request) -> None:
+    _pool_stats.requests += 1
+    _pool_stats.hits += 1
+    request.extensions["trace"] = _trace
+    request.extensions["auth_metrics_start"] = time.perf_counter()
+
+
+async def _on_response(response: httpx.Response) -> None:
+    start = response.request.extensions.get("auth_metrics_start")
+    if start is not None:
+        auth_metrics.observe(
+            auth_metrics.current_handler(), "gotrue", time.perf_counter() - start
+        )
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the process-wide HTTP client shared by all auth clients."""
+    global _http_client
+    if _http_client is None or _http_client.is_closed:
+        _http_client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=POOL_MAX_CONNECTIONS,
+                max_keepalive_connections=POOL_MAX_KEEPALIVE,
+                keepalive_expiry=POOL_KEEPALIVE_EXPIRY,
+            ),
+            follow_redirects=True,
+            http2=True,
+            event_hooks={"request": [_on_request], "response": [_on_response]},
+        )
+        logger.info(
+            f"Created shared Supabase connection pool "
+            f"(max_connections={POOL_MAX_CONNECTIONS}, "
+            f"max_keepalive={POOL_MAX_KEEPALIVE}, "
+            f"keepalive_expiry={POOL_KEEPALIVE_EXPIRY}s)"
+        )
+    return _http_client
+
+
+async def close_http_client() -> None:
+    """Close the shared HTTP client, dropping all pooled connections."""
+    global _http_client
+    if _http_client is not None:
+        client, _http_client = _http_client, None
+        await client.aclose()
+
+
+def pool_stats() -> dict:
+    """Return the hit/miss counters of the shared connection pool."""
+    return _pool_stats.as_dict()
+
+
+refresh_flight = SingleFlight(result_ttl=REFRESH_REUSE_WINDOW)
+
+
+def refresh_stats() -> dict:
+    """Return how many token refreshes ran and how many were coalesced."""
+    return refresh_flight.stats.as_dict()
+
+
+def get_auth_client(storage) -> "PooledGoTrueClient":
+    """Build an async GoTrue client bound to the given session storage.
+
+    The storage implements gotrue's storage interface, with either sync or
+    async methods. The client itself is cheap; the HTTP connection pool behind
+    it is shared across the worker process, so only the storage binding is
+    per request. gotrue is imported on the first call rather than with the
+    app, which keeps it out of cold starts and compiles.
+    """
+    from supabase_auth_X_reflex.gotrue_client import (
+        AsyncStorageAdapter,
+        PooledGoTrueClient,
+    )
+
+    if not inspect.iscoroutinefunction(storage.get_item):
+        storage = AsyncStorageAdapter(storage)
+    return PooledGoTrueClient(
+        url=f"{supabase_url}/auth/v1",
+        headers={
+            "apiKey": supabase_key,
+            "Authorization": f"Bearer {supabase_key}",
+        },
+        # Refreshes happen on demand in get_session(); a background timer per
+        # short-lived client would outlive the request it was created for.
+        auto_refresh_token=False,
+        persist_session=True,
+        storage=storage,
+        http_client=get_http_client(),
+        flow_type="pkce",
+    )
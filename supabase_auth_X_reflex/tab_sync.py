@@ -0,0 +1,110 @@
+import reflex as rx
+from reflex.event import no_args_event_spec, passthrough_event_spec
+from reflex.utils.imports import ImportVar
+
+from supabase_auth_X_reflex.auth_state import (
+    SYNCED_COOKIES,
+    TAB_SYNC,
+    TAB_SYNC_CHANNEL,
+    AuthState,
+)
+
+# Held by the tab that runs its browser's background refresh.
+REFRESH_LOCK = "supabase-auth-refresh"
+
+_COMPONENT_CODE = """
+const authTabSyncCookies = new Cookies();
+
+// One channel and one lock request per tab, shared by the pages it shows.
+function authTabSync(channel, lock) {
+  if (window.authTabSync === undefined) {
+    const sync = {leader: true, handlers: {}};
+    window.authTabSync = sync;
+    if (typeof BroadcastChannel !== "undefined" && navigator.locks) {
+      sync.leader = false;
+      sync.receiver = new BroadcastChannel(channel);
+      sync.receiver.onmessage = (message) => sync.handlers.onChange?.(message.data);
+      // Granted to one tab at a time and held until that tab closes.
+      navigator.locks.request(lock, () => {
+        sync.leader = true;
+        sync.handlers.onLead?.();
+        return new Promise(() => {});
+      });
+    }
+  }
+  return window.authTabSync;
+}
+
+function AuthTabSync({channel, lock, cookieNames, onChange, onLead}) {
+  useEffect(() => {
+    const sync = authTabSync(channel, lock);
+    sync.handlers = {
+      onChange: (change) => {
+        const cookies = {};
+        for (const name of cookieNames) {
+          cookies[name] = authTabSyncCookies.get(name) ?? "";
+        }
+        onChange?.(change, cookies);
+      },
+      onLead,
+    };
+    return () => {
+      sync.handlers = {};
+    };
+  });
+
+  // Tell every page's state, including one the server lost, that it leads.
+  useEffect(() => {
+    if (authTabSync(channel, lock).leader) {
+      onLead?.();
+    }
+  }, []);
+
+  return null;
+}
+"""
+
+
+class AuthTabSync(rx.Component):
+    """Keeps the tabs of a browser on one session.
+
+    Listens on a BroadcastChannel for the changes other tabs announce with
+    `broadcast_session_change`, and hands them to the backend together with
+    the browser's current auth cookies. A Web Lock picks the one tab that
+    runs the background refresh; when it closes, the next tab takes over.
+    Without BroadcastChannel or Web Locks, every tab refreshes on its own.
+    """
+
+    tag = "AuthTabSync"
+
+    channel: rx.Var[str]
+    lock: rx.Var[str]
+    cookie_names: rx.Var[list[str]]
+
+    # Another tab signed in, refreshed or signed out: (change, cookies).
+    on_change: rx.EventHandler[passthrough_event_spec(str, dict[str, str])]
+
+    # This tab runs its browser's background refresh.
+    on_lead: rx.EventHandler[no_args_event_spec]
+
+    def add_imports(self) -> dict:
+        return {
+            "react": "useEffect",
+            "universal-cookie": ImportVar(tag="Cookies", is_default=True),
+        }
+
+    def add_custom_code(self) -> list[str]:
+        return [_COMPONENT_CODE]
+
+
+def auth_tab_sync() -> rx.Component:
+    """Add to every page that shows auth state; renders nothing."""
+    if not TAB_SYNC:
+        return rx.fragment()
+    return AuthTabSync.create(
+        channel=TAB_SYNC_CHANNEL,
+        lock=REFRESH_LOCK,
+        cookie_names=list(SYNCED_COOKIES),
+        on_change=AuthState.sync_session,
+        on_lead=AuthState.lead_refresh,
+    )
@@ -0,0 +1,128 @@
+import os
+import time
+from collections import OrderedDict
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+AUTH_THROTTLE = os.environ.get("AUTH_THROTTLE", "true") == "true"
+# Attempts allowed per minute once the burst is used up.
+THROTTLE_IP_PER_MINUTE = float(os.environ.get("AUTH_THROTTLE_IP_PER_MINUTE", "30"))
+THROTTLE_IP_BURST = int(os.environ.get("AUTH_THROTTLE_IP_BURST", "20"))
+THROTTLE_ACCOUNT_PER_MINUTE = float(
+    os.environ.get("AUTH_THROTTLE_ACCOUNT_PER_MINUTE", "5")
+)
+THROTTLE_ACCOUNT_BURST = int(os.environ.get("AUTH_THROTTLE_ACCOUNT_BURST", "5"))
+THROTTLE_MAX_KEYS = int(os.environ.get("AUTH_THROTTLE_MAX_KEYS", "100000"))
+# Header in which a trusted reverse proxy passes on the client address, e.g.
+# "X-Forwarded-For". Empty uses the connection's peer address, which behind
+# a proxy is the proxy's own.
+TRUSTED_PROXY_HEADER = os.environ.get("AUTH_TRUSTED_PROXY_HEADER", "").lower()
+# How many trusted proxies append to that header.
+TRUSTED_PROXY_HOPS = int(os.environ.get("AUTH_TRUSTED_PROXY_HOPS", "1"))
+
+
+def client_ip(peer: str, headers: Mapping[str, str]) -> str:
+    """Return the address to throttle a request by.
+
+    Entries a client put in the header itself come before the ones the
+    trusted proxies appended, so the address is counted from the right.
+    """
+    if TRUSTED_PROXY_HEADER:
+        forwarded = [
+            address.strip()
+            for address in headers.get(TRUSTED_PROXY_HEADER, "").split(",")
+            if address.strip()
+        ]
+        if forwarded:
+            return forwarded[-min(TRUSTED_PROXY_HOPS, len(forwarded))]
+    return peer
+
+
+@dataclass
+class ThrottleStats:
+    allowed: int = 0
+    rejected_ip: int = 0
+    rejected_account: int = 0
+    evictions: int = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "allowed": self.allowed,
+            "rejected_ip": self.rejected_ip,
+            "rejected_account": self.rejected_account,
+            "evictions": self.evictions,
+        }
+
+
+class TokenBucketLimiter:
+    """A token bucket per key, refilled at `rate` tokens per second.
+
+    At most `max_keys` buckets are kept; the least recently used is evicted
+    first, which only ever forgets a client's past attempts.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = THROTTLE_MAX_KEYS):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self.evictions = 0
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def _tokens(self, key: str, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return float(self.burst)
+        tokens, updated_at = bucket
+        return min(float(self.burst), tokens + (now - updated_at) * self.rate)
+
+    def has_token(self, key: str) -> bool:
+        return self._tokens(key, time.monotonic()) >= 1
+
+    def take(self, key: str) -> None:
+        """Spend one token; callers check `has_token` first."""
+        now = time.monotonic()
+        self._buckets[key] = (self._tokens(key, now) - 1, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+            self.evictions += 1
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+
+class LoginThrottle:
+    """Rate limits auth attempts per client IP and per account email."""
+
+    def __init__(self):
+        self.stats = ThrottleStats()
+        self.by_ip = TokenBucketLimiter(THROTTLE_IP_PER_MINUTE / 60, THROTTLE_IP_BURST)
+        self.by_account = TokenBucketLimiter(
+            THROTTLE_ACCOUNT_PER_MINUTE / 60, THROTTLE_ACCOUNT_BURST
+        )
+
+    def allow(self, ip: str, email: str) -> bool:
+        """Record an attempt, or return False if it should be rejected.
+
+        Rejected attempts don't spend tokens, so a client that waits is let
+        through again at the configured rate.
+        """
+        account = email.strip().lower()
+        if not self.by_ip.has_token(ip):
+            self.stats.rejected_ip += 1
+            return False
+        if account and not self.by_account.has_token(account):
+            self.stats.rejected_account += 1
+            return False
+        self.by_ip.take(ip)
+        if account:
+            self.by_account.take(account)
+        self.stats.allowed += 1
+        return True
+
+    def stats_dict(self) -> dict:
+        self.stats.evictions = self.by_ip.evictions + self.by_account.evictions
+        return self.stats.as_dict()
+
+
+login_throttle = LoginThrottle()
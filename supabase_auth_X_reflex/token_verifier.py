@@ -0,0 +1,137 @@
+import logging
+import os
+import time
+
+import jwt
+
+from supabase_auth_X_reflex.circuit_breaker import auth_breaker, operation_timeout
+from supabase_auth_X_reflex.supabase_client import (
+    get_http_client,
+    supabase_key,
+    supabase_url,
+)
+
+logger = logging.getLogger(__name__)
+
+AUTH_VERIFY_MODE = os.environ.get("AUTH_VERIFY_MODE", "local")
+JWKS_TTL = float(os.environ.get("SUPABASE_JWKS_TTL", "600"))
+# Minimum delay between two forced JWKS refreshes, so tokens with unknown
+# key ids can't make us hammer the JWKS endpoint.
+JWKS_MIN_REFRESH_INTERVAL = 30.0
+CLOCK_LEEWAY = 10
+
+
+class TokenVerifier:
+    """Verifies Supabase access tokens locally.
+
+    Tokens signed with the project's shared secret (HS256) are checked against
+    SUPABASE_JWT_SECRET. Tokens signed with asymmetric keys are checked against
+    the project's JWKS, which is cached for `jwks_ttl` seconds and refetched
+    early when a token references an unknown key id or fails its signature
+    check (key rotation).
+    """
+
+    def __init__(
+        self,
+        jwks_url: str,
+        issuer: str,
+        audience: str = "authenticated",
+        secret: str | None = None,
+        jwks_ttl: float = JWKS_TTL,
+    ):
+        self.jwks_url = jwks_url
+        self.issuer = issuer
+        self.audience = audience
+        self.secret = secret
+        self.jwks_ttl = jwks_ttl
+        self._jwks: jwt.PyJWKSet | None = None
+        self._jwks_fetched_at = 0.0
+
+    def _jwks_fresh(self) -> bool:
+        return (
+            self._jwks is not None
+            and time.monotonic() - self._jwks_fetched_at < self.jwks_ttl
+        )
+
+    def _can_force_refresh(self) -> bool:
+        return time.monotonic() - self._jwks_fetched_at >= JWKS_MIN_REFRESH_INTERVAL
+
+    async def _refresh_jwks(self) -> None:
+        try:
+            response = await auth_breaker.call(
+                lambda: get_http_client().get(
+                    self.jwks_url, headers={"apiKey": supabase_key}
+                ),
+                operation_timeout("jwks"),
+            )
+            response.raise_for_status()
+            self._jwks = jwt.PyJWKSet.from_dict(response.json())
+        except Exception as e:
+            logger.warning(f"Could not refresh JWKS from {self.jwks_url}: {e}")
+        # Also stamp failed fetches so a broken endpoint is retried at most
+        # once per refresh interval.
+        self._jwks_fetched_at = time.monotonic()
+
+    async def _get_signing_key(self, kid: str | None, force: bool = False):
+        if force or not self._jwks_fresh():
+            await self._refresh_jwks()
+        if self._jwks is None:
+            return None
+        for jwk in self._jwks.keys:
+            if kid is None or jwk.key_id == kid:
+                return jwk
+        if not force and self._can_force_refresh():
+            return await self._get_signing_key(kid, force=True)
+        return None
+
+    def _decode(self, token: str, key, algorithm: str) -> dict:
+        return jwt.decode(
+            token,
+            key,
+            algorithms=[algorithm],
+            audience=self.audience,
+            issuer=self.issuer,
+            leeway=CLOCK_LEEWAY,
+            options={"require": ["exp", "sub"]},
+        )
+
+    async def verify(self, token: str) -> dict | None:
+        """Return the token's claims if it is valid, otherwise None.
+
+        A None result means the token could not be verified locally; callers
+        should fall back to asking the auth server.
+        """
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.PyJWTError:
+            return None
+        algorithm = header.get("alg")
+
+        try:
+            if algorithm == "HS256":
+                if not self.secret:
+                    return None
+                return self._decode(token, self.secret, algorithm)
+
+            jwk = await self._get_signing_key(header.get("kid"))
+            if jwk is None:
+                return None
+            try:
+                return self._decode(token, jwk.key, jwk.algorithm_name)
+            except jwt.InvalidSignatureError:
+                if not self._can_force_refresh():
+                    raise
+                jwk = await self._get_signing_key(header.get("kid"), force=True)
+                if jwk is None:
+                    return None
+                return self._decode(token, jwk.key, jwk.algorithm_name)
+        except jwt.PyJWTError as e:
+            logger.info(f"Local token verification failed: {type(e).__name__}: {e}")
+            return None
+
+
+token_verifier = TokenVerifier(
+    jwks_url=f"{supabase_url}/auth/v1/.well-known/jwks.json",
+    issuer=f"{supabase_url}/auth/v1",
+    secret=os.environ.get("SUPABASE_JWT_SECRET"),
+)